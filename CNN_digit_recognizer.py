@@ -1,11 +1,14 @@
 import os
-os.environ["OMP_NUM_THREADS"] = "10"
+# Respect an explicit thread budget (e.g. from parallel_infer workers), otherwise use the host's cores
+os.environ.setdefault("OMP_NUM_THREADS", str(os.cpu_count() or 1))
 import sys
+import time
 import numpy as np
-from PIL import Image
 from simple_cnn import SimpleCNN
 import pickle
 import conv2d
+import matmul_dispatch
+from image_pipeline import load_dataset, load_batch
 
 # Configuration
 IMG_SIZE = 10
@@ -15,39 +18,23 @@ MODEL_FILE = "trained_model.pkl"
 EPOCHS = 1
 LR = 0.01
 BATCH_SIZE = 1
+SEED = None  # set for reproducible runs (e.g. to compare data-parallel and single-process training)
 
-def load_data(data_dir):
+def load_data(data_dir, img_size=IMG_SIZE):
     """
     Loads image data and labels from the specified directory.
 
+    Uses the same draft-mode decoding as load_image, so models are trained and
+    evaluated on identical preprocessing.
+
     Args:
         data_dir (str): Path to the dataset directory. Expects subfolders named 0-9, each containing .jpg images.
+        img_size (int, optional): Size the images are resized to. Default is IMG_SIZE.
 
     Returns:
-        tuple: (X, y) where X is a numpy array of shape (num_samples, 1, IMG_SIZE, IMG_SIZE) and y is a numpy array of labels.
-    """
-    X = []
-    y = []
-    for label in range(NUM_CLASSES):
-        folder = os.path.join(data_dir, str(label))
-        if not os.path.isdir(folder):
-            continue
-        for fname in os.listdir(folder):
-            if fname.endswith(".jpg"):
-                img_path = os.path.join(folder, fname)
-                img = Image.open(img_path).convert('L')
-                img = img.resize((IMG_SIZE, IMG_SIZE))
-                arr = np.array(img) / 255.0
-                X.append(arr)
-                y.append(label)
-    
-    X = X[:len(X)//4]
-    y = y[:len(y)//4]
-    # X = X[0]
-    # y = y[0]
-    X = np.array(X).reshape(-1, 1, IMG_SIZE, IMG_SIZE)
-    y = np.array(y)
-    return X, y
+        tuple: (X, y) where X is a float32 array of shape (num_samples, 1, img_size, img_size) and y is a numpy array of labels.
+    """
+    return load_dataset(data_dir, img_size, NUM_CLASSES)
 
 def one_hot(y, num_classes=10):
     """
@@ -89,40 +76,144 @@ def accuracy(pred, label):
     """
     return np.mean(np.argmax(pred, axis=1) == np.argmax(label, axis=1))
 
-def train():
+def train_epoch(model, X, y_onehot, permutation, batch_size, lr):
+    """
+    Runs one epoch of mini-batch SGD in the current process.
+
+    Args:
+        model (SimpleCNN): Model to train in place.
+        X (np.ndarray): Training images.
+        y_onehot (np.ndarray): One-hot encoded labels.
+        permutation (np.ndarray): Sample order for this epoch.
+        batch_size (int): Mini-batch size.
+        lr (float): Learning rate.
+
+    Returns:
+        float: Sum of the mini-batch losses.
+    """
+    X_shuffled, y_shuffled = X[permutation], y_onehot[permutation]
+
+    total_loss = 0
+    for i in range(0, len(X_shuffled), batch_size):
+        x_batch = X_shuffled[i:i+batch_size]
+        y_batch = y_shuffled[i:i+batch_size]
+
+        output = model.forward(x_batch)
+        loss = cross_entropy_loss(output, y_batch)
+        total_loss += loss
+
+        d_out = (output - y_batch) / batch_size
+        model.backward(d_out, lr)
+    return total_loss
+
+def model_file(img_size=IMG_SIZE):
+    """
+    Returns the file name of the trained model for an input resolution.
+
+    Args:
+        img_size (int, optional): Input resolution. Default is IMG_SIZE.
+
+    Returns:
+        str: MODEL_FILE for the default resolution, 'trained_model_<S>x<S>.pkl' otherwise.
+    """
+    if img_size == IMG_SIZE:
+        return MODEL_FILE
+    return f"trained_model_{img_size}x{img_size}.pkl"
+
+def train(workers=1, img_size=IMG_SIZE):
     """
     Trains the SimpleCNN model on the dataset.
 
     Loads data, trains for a specified number of epochs, prints loss and accuracy, and saves the trained model.
+
+    Args:
+        workers (int, optional): Number of data-parallel worker processes. Default is 1 (no workers).
+        img_size (int, optional): Input resolution the images are resized to. Default is IMG_SIZE.
     """
     print("Loading training data...")
-    X, y = load_data(DATA_DIR)
+    X, y = load_data(DATA_DIR, img_size)
     y_onehot = one_hot(y)
 
-    model = SimpleCNN()
+    if SEED is not None:
+        np.random.seed(SEED)
+    model = SimpleCNN(img_size)
+
+    trainer = None
+    if workers > 1:
+        from parallel_train import DataParallelTrainer
+        trainer = DataParallelTrainer(model, X, y_onehot, workers)
 
     print("Training model...")
     for epoch in range(EPOCHS):
         permutation = np.random.permutation(len(X))
-        X_shuffled, y_shuffled = X[permutation], y_onehot[permutation]
 
-        total_loss = 0
-        for i in range(0, len(X_shuffled), BATCH_SIZE):
-            x_batch = X_shuffled[i:i+BATCH_SIZE]
-            y_batch = y_shuffled[i:i+BATCH_SIZE]
+        start = time.perf_counter()
+        if trainer is None:
+            total_loss = train_epoch(model, X, y_onehot, permutation, BATCH_SIZE, LR)
+        else:
+            total_loss = trainer.run_epoch(permutation, BATCH_SIZE, LR)
+        elapsed = time.perf_counter() - start
 
-            output = model.forward(x_batch)
-            loss = cross_entropy_loss(output, y_batch)
-            total_loss += loss
+        acc = accuracy(model.forward(X), y_onehot)
+        print(f"Epoch {epoch+1}/{EPOCHS} - Loss: {total_loss:.4f}, Accuracy: {acc:.4f}, Time: {elapsed:.2f}s")
 
-            d_out = (output - y_batch) / BATCH_SIZE
-            model.backward(d_out, LR)
+    if trainer is not None:
+        trainer.close()
 
-        acc = accuracy(model.forward(X), y_onehot)
-        print(f"Epoch {epoch+1}/{EPOCHS} - Loss: {total_loss:.4f}, Accuracy: {acc:.4f}")
+    model.save(model_file(img_size))
+    print(f"Training completed. Model saved to '{model_file(img_size)}'.")
+
+def finetune(path=MODEL_FILE, epochs=EPOCHS):
+    """
+    Retrains only the dense head of a trained model, with conv1-conv3 frozen.
+
+    The conv features of the training set come from the on-disk feature cache,
+    so they are computed once per set of conv weights; every epoch then runs
+    dense1/dense2 only. The model is saved back to path.
+
+    Args:
+        path (str, optional): Trained model file. Default is MODEL_FILE.
+        epochs (int, optional): Number of epochs. Default is EPOCHS.
+    """
+    from feature_cache import cached_features, train_head, head_accuracy
+
+    model = SimpleCNN()
+    model.load(path)
+    print("Loading training data...")
+    X, y = load_data(DATA_DIR, model.img_size)
+    y_onehot = one_hot(y)
+    if SEED is not None:
+        np.random.seed(SEED)
 
-    model.save(MODEL_FILE)
-    print(f"Training completed. Model saved to '{MODEL_FILE}'.")
+    start = time.perf_counter()
+    features = cached_features(model, X)
+    print(f"Conv features {features.shape} ready in {time.perf_counter() - start:.2f}s")
+
+    print("Fine-tuning dense head...")
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        total_loss = train_head(model, features, y_onehot, 1, LR, BATCH_SIZE)[0]
+        elapsed = time.perf_counter() - start
+        acc = head_accuracy(model, features, y)
+        print(f"Epoch {epoch+1}/{epochs} - Loss: {total_loss:.4f}, Accuracy: {acc:.4f}, Time: {elapsed:.2f}s")
+
+    model.save(path)
+    print(f"Fine-tuning completed. Model saved to '{path}'.")
+
+def load_image(image_path, img_size=IMG_SIZE):
+    """
+    Loads a single image and preprocesses it for the model.
+
+    Uses JPEG draft-mode decoding, so large sources are decoded at a reduced scale.
+
+    Args:
+        image_path (str): Path to the image file.
+        img_size (int, optional): Size the image is resized to. Default is IMG_SIZE.
+
+    Returns:
+        np.ndarray: float32 array of shape (1, 1, img_size, img_size) with values in [0, 1].
+    """
+    return load_batch([image_path], img_size)
 
 def infer(image_path):
     """
@@ -135,25 +226,29 @@ def infer(image_path):
     model = SimpleCNN()
     model.load(MODEL_FILE)
 
-    img = Image.open(image_path).convert('L')
-    img = img.resize((IMG_SIZE, IMG_SIZE))
-    arr = np.array(img) / 255.0
-    x = arr.reshape(1, 1, IMG_SIZE, IMG_SIZE)
+    x = load_image(image_path, model.img_size)
 
     output = model.forward(x)
     pred = np.argmax(output)
     print(f"Predicted class: {pred}")
+    matmul_dispatch.print_skip_report()
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  python CNN_digit_recognizer.py train")
+        print("  python CNN_digit_recognizer.py train [num_workers] [img_size]")
+        print("  python CNN_digit_recognizer.py finetune [model.pkl] [epochs]")
         print("  python CNN_digit_recognizer.py infer path_to_image.jpg")
         sys.exit(1)
 
     if sys.argv[1] == "train":
         conv2d.MODE = "train"
-        train()
+        train(int(sys.argv[2]) if len(sys.argv) > 2 else 1,
+              int(sys.argv[3]) if len(sys.argv) > 3 else IMG_SIZE)
+    elif sys.argv[1] == "finetune":
+        conv2d.MODE = "train"
+        finetune(sys.argv[2] if len(sys.argv) > 2 else MODEL_FILE,
+                 int(sys.argv[3]) if len(sys.argv) > 3 else EPOCHS)
     elif sys.argv[1] == "infer":
         if len(sys.argv) != 3:
             print("Usage: python CNN_digit_recognizer.py infer path_to_image.jpg")
@@ -162,4 +257,4 @@ if __name__ == "__main__":
         infer(sys.argv[2])
     else:
         print(f"Unknown command: {sys.argv[1]}")
-        print("Use 'train' or 'infer'.")
+        print("Use 'train', 'finetune' or 'infer'.")
@@ -0,0 +1,228 @@
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import numpy as np
+import conv2d
+import matmul_dispatch
+import matrix_hw_wrapper
+
+# Persistent shape -> backend cost table
+COST_TABLE_PATH = "autotune_costs.json"
+
+# Files whose contents define the backends; any change invalidates the table
+FINGERPRINT_FILES = ["matmul_dispatch.py", "matrix_hw_wrapper.py", "test_matrix_mul_spi.py",
+                     "test_matrix_mul_axi.py", "Makefile", "RTL/*.v"]
+
+REPEATS = 3
+
+# Loaded table: {"fingerprint", "entries": [{"shape", "costs", "best"}]}, and memoized choices
+_table = None
+_choices = {}
+
+def fingerprint():
+    """
+    Hashes the backend sources and the settings that change their cost.
+
+    Returns:
+        str: Hex digest.
+    """
+    base = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256()
+    for pattern in FINGERPRINT_FILES:
+        for path in sorted(glob.glob(os.path.join(base, pattern))):
+            h.update(os.path.relpath(path, base).encode())
+            with open(path, "rb") as f:
+                h.update(f.read())
+    settings = (np.__version__, sorted(matmul_dispatch.BACKENDS), matrix_hw_wrapper.SIM_PROFILE,
+                matrix_hw_wrapper.HW_MAX_M, matrix_hw_wrapper.HW_MAX_K, matrix_hw_wrapper.HW_MAX_N)
+    h.update(repr(settings).encode())
+    return h.hexdigest()
+
+def model_gemm_shapes(model, batch_size):
+    """
+    Traces the GEMM shapes a forward pass sends to the matmul backends.
+
+    Args:
+        model (SimpleCNN): Model to trace.
+        batch_size (int): Inference batch size.
+
+    Returns:
+        list: Distinct (M, K, N) tuples in call order.
+    """
+    shapes = []
+
+    def record(A, B):
+        shape = (A.shape[0], A.shape[1], B.shape[1])
+        if shape not in shapes:
+            shapes.append(shape)
+        return np.dot(A, B)
+
+    saved = conv2d.MODE, matmul_dispatch.BACKEND, matmul_dispatch.ZERO_SKIP
+    # Inference path, full GEMMs (zero skipping only shrinks them)
+    conv2d.MODE, matmul_dispatch.BACKEND, matmul_dispatch.ZERO_SKIP = "infer", record, False
+    try:
+        model.forward(np.random.rand(batch_size, 1, model.img_size, model.img_size))
+    finally:
+        conv2d.MODE, matmul_dispatch.BACKEND, matmul_dispatch.ZERO_SKIP = saved
+    return shapes
+
+def time_backend(name, M, K, N, repeats=REPEATS):
+    """
+    Microbenchmarks one backend on one GEMM shape.
+
+    One untimed call comes first (it builds the simulator model for accelerator
+    backends); the best of the following calls is reported.
+
+    Args:
+        name (str): Key of matmul_dispatch.BACKENDS.
+        M (int): Rows of A.
+        K (int): Columns of A.
+        N (int): Columns of B.
+        repeats (int, optional): Timed calls. Default is REPEATS.
+
+    Returns:
+        float: Seconds per call.
+    """
+    fn = matmul_dispatch.BACKENDS[name]
+    A = np.random.uniform(-1, 1, size=(M, K)).astype(np.float32)
+    B = np.random.uniform(-1, 1, size=(K, N)).astype(np.float32)
+    fn(A, B)
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(A, B)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def tune(shapes, backends=None, repeats=REPEATS, path=COST_TABLE_PATH):
+    """
+    Benchmarks every backend on every shape and saves the cost table.
+
+    Entries of an existing, still valid table are kept unless re-measured. A backend
+    that fails (e.g. no simulator installed) is marked unavailable and not retried.
+
+    Args:
+        shapes (list): (M, K, N) tuples, e.g. from model_gemm_shapes().
+        backends (list, optional): Keys of matmul_dispatch.BACKENDS. Defaults to all of them.
+        repeats (int, optional): Timed calls per shape and backend. Default is REPEATS.
+        path (str, optional): Output JSON file. Default is COST_TABLE_PATH.
+
+    Returns:
+        dict: The saved table.
+    """
+    backends = list(backends or matmul_dispatch.BACKENDS)
+    table = load(path) or {"fingerprint": fingerprint(), "entries": []}
+    entries = {tuple(e["shape"]): e for e in table["entries"]}
+    unavailable = set()
+    for M, K, N in shapes:
+        costs = {}
+        for name in backends:
+            if name in unavailable:
+                costs[name] = None
+                continue
+            try:
+                costs[name] = time_backend(name, M, K, N, repeats)
+            except Exception as e:
+                print(f"Backend '{name}' unavailable: {e}")
+                unavailable.add(name)
+                costs[name] = None
+        timed = {name: cost for name, cost in costs.items() if cost is not None}
+        if not timed:
+            continue
+        entries[(M, K, N)] = {"shape": [M, K, N], "costs": costs, "best": min(timed, key=timed.get)}
+
+    table["entries"] = list(entries.values())
+    with open(path, "w") as f:
+        json.dump(table, f, indent=1)
+    install(table)
+    return table
+
+def load(path=COST_TABLE_PATH):
+    """
+    Loads a cost table if it exists and matches the current backends.
+
+    Args:
+        path (str, optional): JSON file. Default is COST_TABLE_PATH.
+
+    Returns:
+        dict or None: The table, or None when missing or stale.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        table = json.load(f)
+    if table.get("fingerprint") != fingerprint():
+        print(f"Cost table '{path}' was measured with different backends; ignoring it. "
+              f"Re-run 'python autotune.py' to re-tune.")
+        return None
+    return table
+
+def install(table):
+    """
+    Makes a table the one used by choose().
+
+    Args:
+        table (dict or None): Table from tune() or load(); None reloads COST_TABLE_PATH on next use.
+    """
+    global _table
+    _table = table
+    _choices.clear()
+
+def choose(M, K, N, default="sw"):
+    """
+    Picks the fastest measured backend for a GEMM shape.
+
+    The table is loaded from COST_TABLE_PATH on first use. Shapes that were not
+    measured (e.g. compacted by zero skipping) use the entry nearest in log-space.
+
+    Args:
+        M (int): Rows of A.
+        K (int): Columns of A.
+        N (int): Columns of B.
+        default (str, optional): Backend used without a valid table. Default is "sw".
+
+    Returns:
+        str: Key of matmul_dispatch.BACKENDS.
+    """
+    global _table
+    if _table is None:
+        _table = load() or {"entries": []}
+    key = (M, K, N)
+    if key not in _choices:
+        entries = [e for e in _table["entries"] if e["best"] in matmul_dispatch.BACKENDS]
+        if not entries:
+            _choices[key] = default
+        else:
+            target = np.log(np.maximum(key, 1))
+            nearest = min(entries, key=lambda e: np.abs(np.log(np.maximum(e["shape"], 1)) - target).sum())
+            _choices[key] = nearest["best"]
+    return _choices[key]
+
+def print_table(table):
+    """
+    Prints measured milliseconds per backend and the chosen backend for every shape.
+
+    Args:
+        table (dict): Cost table.
+    """
+    names = sorted({name for e in table["entries"] for name in e["costs"]})
+    print(f"{'M x K x N':<18}" + "".join(f"{name:>12}" for name in names) + "   best")
+    for e in sorted(table["entries"], key=lambda e: e["shape"]):
+        cells = "".join(f"{e['costs'][n] * 1e3:10.3f}ms" if e["costs"].get(n) is not None else f"{'-':>12}"
+                        for n in names)
+        print(f"{'x'.join(map(str, e['shape'])):<18}{cells}   {e['best']}")
+
+if __name__ == "__main__":
+    from simple_cnn import SimpleCNN, IMG_SIZE
+
+    img_size = int(sys.argv[1]) if len(sys.argv) > 1 else IMG_SIZE
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    backends = sys.argv[3].split(",") if len(sys.argv) > 3 else None
+
+    shapes = model_gemm_shapes(SimpleCNN(img_size), batch_size)
+    print(f"{len(shapes)} GEMM shapes for {img_size}x{img_size}, batch {batch_size}")
+    print_table(tune(shapes, backends))
+    print(f"Cost table saved to '{COST_TABLE_PATH}'. Set matmul_dispatch.BACKEND = \"auto\" to use it.")
@@ -0,0 +1,115 @@
+from cocotb.triggers import RisingEdge
+
+# Cycles to wait for a handshake before giving up
+AXI_TIMEOUT_CYCLES = 100
+
+class AxiLiteMaster:
+    """
+    Minimal cocotb AXI4-Lite master for a single slave port.
+
+    Drives one transaction at a time, the same way the Verilog tasks in
+    RTL/tb_matrixmul_axi_wrapper.v do: address and data are presented together
+    and held until the slave answers with BVALID (writes) or RVALID (reads).
+
+    Attributes:
+        dut: The cocotb DUT object.
+        prefix (str): Port name prefix of the slave interface, e.g. 's00_axi'.
+        clk: Clock signal the interface is synchronous to.
+        writes (int): Write transactions issued.
+        reads (int): Read transactions issued.
+    """
+    def __init__(self, dut, prefix="s00_axi"):
+        """
+        Binds the master to the DUT ports and drives them idle.
+
+        Args:
+            dut: The cocotb DUT object.
+            prefix (str, optional): Port name prefix. Default is 's00_axi'.
+        """
+        self.dut = dut
+        self.prefix = prefix
+        self.clk = self._port("aclk")
+        self.writes = 0
+        self.reads = 0
+        for name in ("awaddr", "awprot", "awvalid", "wdata", "wstrb", "wvalid", "bready",
+                     "araddr", "arprot", "arvalid", "rready"):
+            self._port(name).value = 0
+
+    def _port(self, name):
+        return getattr(self.dut, f"{self.prefix}_{name}")
+
+    async def _wait_for(self, name):
+        """
+        Waits for a slave output to go high.
+
+        Args:
+            name (str): Port name without prefix, e.g. 'bvalid'.
+        """
+        signal = self._port(name)
+        for _ in range(AXI_TIMEOUT_CYCLES):
+            await RisingEdge(self.clk)
+            if signal.value.integer == 1:
+                return
+        raise RuntimeError(f"AXI timeout waiting for {self.prefix}_{name}")
+
+    async def write(self, addr, data):
+        """
+        Performs one AXI4-Lite write with all byte lanes enabled.
+
+        Args:
+            addr (int): Register byte address.
+            data (int): 32-bit value to write.
+        """
+        await RisingEdge(self.clk)
+        self._port("awaddr").value = addr
+        self._port("awprot").value = 0
+        self._port("awvalid").value = 1
+        self._port("wdata").value = data & 0xFFFFFFFF
+        self._port("wstrb").value = 0xF
+        self._port("wvalid").value = 1
+        self._port("bready").value = 1
+
+        # The slave accepts address and data together, then raises BVALID
+        await self._wait_for("bvalid")
+
+        self._port("awvalid").value = 0
+        self._port("wvalid").value = 0
+        self._port("bready").value = 0
+        # Let the slave re-arm its write channel before the next transaction
+        await RisingEdge(self.clk)
+        self.writes += 1
+
+    async def read(self, addr):
+        """
+        Performs one AXI4-Lite read.
+
+        Args:
+            addr (int): Register byte address.
+
+        Returns:
+            int: 32-bit value returned by the slave.
+        """
+        await RisingEdge(self.clk)
+        self._port("araddr").value = addr
+        self._port("arprot").value = 0
+        self._port("arvalid").value = 1
+        self._port("rready").value = 1
+
+        await self._wait_for("rvalid")
+        data = self._port("rdata").value.integer
+
+        self._port("arvalid").value = 0
+        self._port("rready").value = 0
+        await RisingEdge(self.clk)
+        self.reads += 1
+        return data
+
+    async def wait_cycles(self, cycles):
+        """
+        Idles the bus for a number of clock cycles.
+
+        Args:
+            cycles (int): Number of rising edges to wait.
+        """
+        for _ in range(cycles):
+            await RisingEdge(self.clk)
@@ -0,0 +1,65 @@
+import sys
+import time
+import numpy as np
+import matrix_hw_wrapper
+from matrix_hw_wrapper import matrix_mul_hw, matrix_mul_axi
+
+# GEMM shapes (M, K, N) to time: conv1, conv2 and a dense2-sized job of the 10x10 model
+SHAPES = [(100, 9, 8), (100, 72, 32), (16, 128, 10)]
+
+INTERFACES = {
+    "spi": matrix_mul_hw,
+    "axi": matrix_mul_axi,
+}
+
+def bench_interface(name, A, B, profile=None):
+    """
+    Runs one GEMM on an accelerator interface and collects its timings.
+
+    The first call of each interface also compiles its model, so the caller warms
+    both interfaces up before timing.
+
+    Args:
+        name (str): Key of INTERFACES.
+        A (np.ndarray): Input matrix of shape (M, K).
+        B (np.ndarray): Input matrix of shape (K, N).
+        profile (str, optional): Simulator profile from SIM_PROFILES.
+
+    Returns:
+        tuple: (wall_s, sim_timing dict, max_abs_error).
+    """
+    t0 = time.perf_counter()
+    C = INTERFACES[name](A, B, profile=profile)
+    wall = time.perf_counter() - t0
+    return wall, dict(matrix_hw_wrapper.LAST_SIM_TIMING), np.max(np.abs(C - np.matmul(A, B)))
+
+def main(profile=None):
+    """
+    Prints simulated transfer and compute time per GEMM for the SPI and AXI paths.
+
+    Transfer time is the load of A and B plus the readback of C in simulated time,
+    which is what the interface determines; compute time is the engine alone.
+
+    Args:
+        profile (str, optional): Simulator profile from SIM_PROFILES.
+    """
+    for M, K, N in SHAPES:
+        A = np.random.uniform(-1, 1, size=(M, K)).astype(np.float32)
+        B = np.random.uniform(-1, 1, size=(K, N)).astype(np.float32)
+        words = M * K + K * N + M * N
+        print(f"GEMM {M}x{K} @ {K}x{N} ({words} words)")
+
+        transfer = {}
+        for name in INTERFACES:
+            bench_interface(name, A, B, profile)  # warm-up / build
+            wall, timing, err = bench_interface(name, A, B, profile)
+            transfer[name] = timing["load_ns"] + timing["readback_ns"]
+            print(f"  {name:<4} load {timing['load_ns'] / 1e3:10.1f}us  "
+                  f"compute {timing['compute_ns'] / 1e3:8.1f}us  "
+                  f"readback {timing['readback_ns'] / 1e3:10.1f}us  "
+                  f"per word {transfer[name] / words:7.1f}ns  "
+                  f"wall {wall:6.2f}s  max err {err:.2e}")
+        print(f"  transfer speedup AXI vs SPI: {transfer['spi'] / transfer['axi']:.2f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,100 @@
+import sys
+import time
+import numpy as np
+import conv2d
+from simple_cnn import SimpleCNN, IMG_SIZE
+
+BATCH_SIZE = 32
+REPEATS = 5
+
+def bench_layout(model, X, layout, repeats=REPEATS):
+    """
+    Times the forward pass of a model in one activation layout.
+
+    Args:
+        model (SimpleCNN): Model to run; its layout is switched in place.
+        X (np.ndarray): Batch of shape (batch_size, 1, img_size, img_size).
+        layout (str): "NCHW" or "NHWC".
+        repeats (int, optional): Timed runs; the best one is reported.
+
+    Returns:
+        tuple: (best_s, output probabilities).
+    """
+    model.set_layout(layout)
+    out = model.forward(X)  # warm-up
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        out = model.forward(X)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def bench_im2col(model, X, layout, repeats=REPEATS):
+    """
+    Times only the im2col gather of every conv layer, on that layer's actual input.
+
+    In NCHW the input of conv2/conv3 is the transposed view returned by the previous
+    layer, so the gather also pays for the layout conversion; in NHWC it reads the
+    GEMM output directly.
+
+    Args:
+        model (SimpleCNN): Model to run; its layout is switched in place.
+        X (np.ndarray): Batch of shape (batch_size, 1, img_size, img_size).
+        layout (str): "NCHW" or "NHWC".
+        repeats (int, optional): Timed runs; the best one is reported.
+
+    Returns:
+        dict: Layer name -> best seconds.
+    """
+    from quantize import layer_inputs
+
+    model.set_layout(layout)
+    inputs = layer_inputs(model, X)
+    timings = {}
+    for name in ("conv1", "conv2", "conv3"):
+        conv = getattr(model, name)
+        best = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            conv.im2col(inputs[name])
+            best = min(best, time.perf_counter() - t0)
+        timings[name] = best
+    return timings
+
+def main(model=None):
+    """
+    Prints forward time of the NCHW and NHWC layouts for every conv algorithm.
+
+    Both layouts gather their im2col windows with the same vectorized strided copy,
+    so the difference is the layout itself: NCHW transposes every conv output back
+    from the GEMM's (B, H, W, C) order and gathers strided channel planes.
+
+    Args:
+        model (str, optional): Trained model file, or an img_size for random weights.
+            Defaults to random weights at IMG_SIZE.
+    """
+    conv2d.MODE = "train"
+    conv2d.LOG_SW_GEMMS = False
+    if model and not model.isdigit():
+        path, model = model, SimpleCNN()
+        model.load(path)
+    else:
+        model = SimpleCNN(int(model) if model else IMG_SIZE)
+    X = np.random.rand(BATCH_SIZE, 1, model.img_size, model.img_size).astype(np.float32)
+
+    for algorithm in ("im2col", "winograd"):
+        conv2d.CONV_ALGORITHM = algorithm
+        nchw_s, nchw_out = bench_layout(model, X, "NCHW")
+        nhwc_s, nhwc_out = bench_layout(model, X, "NHWC")
+        print(f"{algorithm:<9} NCHW {nchw_s * 1e3:8.2f}ms  NHWC {nhwc_s * 1e3:8.2f}ms  "
+              f"speedup {nchw_s / nhwc_s:5.2f}x  max diff {np.max(np.abs(nchw_out - nhwc_out)):.2e}")
+
+    nchw = bench_im2col(model, X, "NCHW")
+    nhwc = bench_im2col(model, X, "NHWC")
+    for name in nchw:
+        print(f"{name} im2col NCHW {nchw[name] * 1e3:8.2f}ms  NHWC {nhwc[name] * 1e3:8.2f}ms  "
+              f"speedup {nchw[name] / nhwc[name]:5.2f}x")
+    model.set_layout("NCHW")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
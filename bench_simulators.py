@@ -0,0 +1,60 @@
+import sys
+import time
+import numpy as np
+from matrix_hw_wrapper import matrix_mul_hw
+
+# GEMM shapes (M, K, N) to time; the default is conv1 of the 10x10 model
+SHAPES = [(100, 9, 8)]
+REPEATS = 3
+
+def bench_profile(profile, M, K, N, repeats=REPEATS):
+    """
+    Times matrix_mul_hw for one simulator profile and GEMM shape.
+
+    The first call includes compiling the model into the profile's build directory;
+    the following calls reuse it and are reported as the steady-state time.
+
+    Args:
+        profile (str): Simulator profile from SIM_PROFILES.
+        M (int): Rows of A.
+        K (int): Columns of A / rows of B.
+        N (int): Columns of B.
+        repeats (int, optional): Number of steady-state calls to average.
+
+    Returns:
+        tuple: (first_call_s, steady_state_s, max_abs_error).
+    """
+    A = np.random.uniform(-1, 1, size=(M, K)).astype(np.float32)
+    B = np.random.uniform(-1, 1, size=(K, N)).astype(np.float32)
+
+    t0 = time.perf_counter()
+    C = matrix_mul_hw(A, B, profile=profile)
+    first = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        C = matrix_mul_hw(A, B, profile=profile)
+    steady = (time.perf_counter() - t0) / repeats
+
+    return first, steady, np.max(np.abs(C - np.matmul(A, B)))
+
+def main(profiles):
+    """
+    Prints first-call and steady-state times per profile with the speedup over Icarus.
+
+    Args:
+        profiles (list): Simulator profiles to compare.
+    """
+    for M, K, N in SHAPES:
+        print(f"GEMM {M}x{K} @ {K}x{N}")
+        baseline = None
+        for profile in profiles:
+            first, steady, err = bench_profile(profile, M, K, N)
+            if profile == "icarus":
+                baseline = steady
+            speedup = f"{baseline / steady:6.2f}x" if baseline else "     -"
+            print(f"  {profile:<16} first {first:8.2f}s  steady {steady:8.2f}s  "
+                  f"speedup {speedup}  max err {err:.2e}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["icarus", "verilator"])
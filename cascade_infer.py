@@ -0,0 +1,190 @@
+import sys
+import time
+import numpy as np
+import conv2d
+from simple_cnn import SimpleCNN, NUM_CLASSES
+
+# Softmax confidences swept by the trade-off report
+THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99)
+
+def forward_macs(model):
+    """
+    Counts the multiply-accumulates of one forward pass for a single image.
+
+    Args:
+        model (SimpleCNN): Model to measure.
+
+    Returns:
+        int: Conv and dense MACs per image.
+    """
+    macs = 0
+    size = model.img_size
+    for conv in (model.conv1, model.conv2, model.conv3):
+        out_c, in_c, k, _ = conv.weights.shape
+        size = (size + 2 * conv.padding - k) // conv.stride + 1
+        macs += size * size * out_c * in_c * k * k
+    # One MAC per dense weight (or factor entry, for a low-rank dense1)
+    return macs + sum(p.size for key, p in model.get_params().items()
+                      if key.startswith('dense') and not key.endswith('_b'))
+
+def batched_forward(model, X, batch_size=32):
+    """
+    Runs a model over a set of images in mini-batches.
+
+    Args:
+        model (SimpleCNN): Model to run.
+        X (np.ndarray): Images of shape (num_samples, 1, img_size, img_size).
+        batch_size (int, optional): Inference batch size. Default is 32.
+
+    Returns:
+        np.ndarray: Output probabilities of shape (num_samples, NUM_CLASSES).
+    """
+    if len(X) == 0:
+        return np.zeros((0, NUM_CLASSES))
+    return np.concatenate([model.forward(X[i:i+batch_size]) for i in range(0, len(X), batch_size)], axis=0)
+
+class CascadeCNN:
+    """
+    Multi-resolution cascade of SimpleCNN models with confidence-based early exit.
+
+    Stages run from the smallest to the largest input resolution. A stage accepts
+    its prediction when the top softmax probability reaches its threshold; only the
+    remaining inputs are passed on. The last stage accepts everything it sees.
+
+    Attributes:
+        models (list): SimpleCNN stages in increasing img_size order.
+        thresholds (list): Confidence threshold of every stage but the last.
+        stage_macs (list): MACs per image of each stage.
+    """
+    def __init__(self, models, thresholds):
+        """
+        Initializes the cascade.
+
+        Args:
+            models (list): SimpleCNN stages in increasing img_size order.
+            thresholds (float or list): One threshold for all early stages, or one per stage but the last.
+        """
+        self.models = list(models)
+        if np.isscalar(thresholds):
+            thresholds = [thresholds] * (len(self.models) - 1)
+        if len(thresholds) != len(self.models) - 1:
+            raise ValueError(f"Expected {len(self.models) - 1} thresholds, got {len(thresholds)}")
+        self.thresholds = list(thresholds)
+        self.stage_macs = [forward_macs(model) for model in self.models]
+
+    def forward(self, inputs, batch_size=32):
+        """
+        Classifies a set of images with early exit.
+
+        Args:
+            inputs (list): One array per stage holding the same images at that stage's
+                resolution, each of shape (num_samples, 1, img_size, img_size).
+            batch_size (int, optional): Inference batch size within a stage. Default is 32.
+
+        Returns:
+            tuple: (probs, exit_stage) where probs has shape (num_samples, NUM_CLASSES)
+            and exit_stage gives the index of the stage that answered for each image.
+        """
+        n = len(inputs[0])
+        probs = np.zeros((n, NUM_CLASSES))
+        exit_stage = np.full(n, -1)
+        pending = np.arange(n)
+        for stage, (model, X) in enumerate(zip(self.models, inputs)):
+            out = batched_forward(model, X[pending], batch_size)
+            if stage == len(self.models) - 1:
+                accept = np.ones(len(pending), dtype=bool)
+            else:
+                accept = out.max(axis=1) >= self.thresholds[stage]
+            probs[pending[accept]] = out[accept]
+            exit_stage[pending[accept]] = stage
+            pending = pending[~accept]
+            if pending.size == 0:
+                break
+        return probs, exit_stage
+
+    def classify(self, image_path):
+        """
+        Classifies one image file, loading it at a higher resolution only when escalated.
+
+        Args:
+            image_path (str): Path to the image file.
+
+        Returns:
+            tuple: (predicted class, confidence, exit stage).
+        """
+        from CNN_digit_recognizer import load_image
+
+        for stage, model in enumerate(self.models):
+            out = model.forward(load_image(image_path, model.img_size))[0]
+            if stage == len(self.models) - 1 or out.max() >= self.thresholds[stage]:
+                return int(np.argmax(out)), float(out.max()), stage
+
+    def average_macs(self, exit_stage):
+        """
+        Average MACs per image given where each image exited.
+
+        Args:
+            exit_stage (np.ndarray): Exit stage per image, from forward().
+
+        Returns:
+            float: Mean MACs per image, counting every stage an image went through.
+        """
+        cumulative = np.cumsum(self.stage_macs)
+        return float(np.mean(cumulative[exit_stage]))
+
+def tradeoff_report(models, inputs, y, thresholds=THRESHOLDS, batch_size=32):
+    """
+    Prints accuracy, throughput and cost of every single model and of the cascade per threshold.
+
+    Args:
+        models (list): SimpleCNN stages in increasing img_size order.
+        inputs (list): The same images at each stage's resolution, as for CascadeCNN.forward().
+        y (np.ndarray): Integer labels.
+        thresholds (iterable, optional): Confidence thresholds to sweep. Default is THRESHOLDS.
+        batch_size (int, optional): Inference batch size. Default is 32.
+    """
+    print(f"{'config':<20} {'accuracy':>9} {'images/s':>10} {'MMACs/img':>10}  exits per stage")
+    for model, X in zip(models, inputs):
+        t0 = time.perf_counter()
+        preds = np.argmax(batched_forward(model, X, batch_size), axis=1)
+        elapsed = time.perf_counter() - t0
+        label = f"single {model.img_size}x{model.img_size}"
+        print(f"{label:<20} {np.mean(preds == y):9.4f} {len(y) / elapsed:10.1f} "
+              f"{forward_macs(model) / 1e6:10.2f}")
+
+    for threshold in thresholds:
+        cascade = CascadeCNN(models, threshold)
+        t0 = time.perf_counter()
+        probs, exit_stage = cascade.forward(inputs, batch_size)
+        elapsed = time.perf_counter() - t0
+        exits = " ".join(f"{np.mean(exit_stage == s):6.1%}" for s in range(len(models)))
+        print(f"{f'cascade t={threshold:g}':<20} {np.mean(np.argmax(probs, axis=1) == y):9.4f} "
+              f"{len(y) / elapsed:10.1f} {cascade.average_macs(exit_stage) / 1e6:10.2f}  {exits}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python cascade_infer.py small_model.pkl,...,large_model.pkl data_dir [data_dir ...]")
+        sys.exit(1)
+
+    from CNN_digit_recognizer import load_data
+
+    # Software GEMMs without per-GEMM logging, so the curves measure the model cost
+    # rather than the simulator or stdout
+    conv2d.MODE = "train"
+    conv2d.LOG_SW_GEMMS = False
+
+    models = []
+    for path in sys.argv[1].split(","):
+        model = SimpleCNN()
+        model.load(path)
+        models.append(model)
+    models.sort(key=lambda model: model.img_size)
+
+    for data_dir in sys.argv[2:]:
+        inputs = []
+        for model in models:
+            X, y = load_data(data_dir, model.img_size)
+            inputs.append(X)
+        print(f"\n{data_dir}: {len(y)} images, stages "
+              + " -> ".join(f"{model.img_size}x{model.img_size}" for model in models))
+        tradeoff_report(models, inputs, y)
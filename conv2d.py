@@ -1,7 +1,26 @@
 import numpy as np
-from matrix_hw_wrapper import matrix_mul_hw
+import matmul_dispatch
+from matrix_hw_wrapper import matrix_mul_hw_resident, upload_weights, release_weights
 
 MODE = "infer"
+# Keep each layer's filters resident on the accelerator and stream only A (inference)
+WEIGHT_STATIONARY = False
+# Forward algorithm: "im2col", "winograd" or "auto" (Winograd when the layer allows it)
+CONV_ALGORITHM = "auto"
+# Print the operand shapes of every software GEMM (disable when timing)
+LOG_SW_GEMMS = True
+
+# Winograd F(2x2, 3x3) transforms: Y = AT [(G g GT) * (BT d B)] A
+WINOGRAD_G = np.array([[1.0, 0.0, 0.0],
+                       [0.5, 0.5, 0.5],
+                       [0.5, -0.5, 0.5],
+                       [0.0, 0.0, 1.0]])
+WINOGRAD_BT = np.array([[1.0, 0.0, -1.0, 0.0],
+                        [0.0, 1.0, 1.0, 0.0],
+                        [0.0, -1.0, 1.0, 0.0],
+                        [0.0, 1.0, 0.0, -1.0]])
+WINOGRAD_AT = np.array([[1.0, 1.0, 1.0, 0.0],
+                        [0.0, 1.0, -1.0, -1.0]])
 
 class Conv2D:
     """
@@ -15,8 +34,11 @@ class Conv2D:
         padding (int): Zero-padding added to both sides of input.
         weights (np.ndarray): Convolutional kernels.
         biases (np.ndarray): Bias terms for each filter.
+        name (str): Layer name used in dispatch statistics.
+        channels_last (bool): Activations are NHWC instead of NCHW (inference only).
     """
-    def __init__(self, in_channels, out_channels, kernel_size, stride=1, padding=0):
+    def __init__(self, in_channels, out_channels, kernel_size, stride=1, padding=0, name=None,
+                 channels_last=False):
         """
         Initializes the Conv2D layer with random weights and zero biases.
 
@@ -26,6 +48,8 @@ class Conv2D:
             kernel_size (int or tuple): Size of the convolutional kernel.
             stride (int, optional): Stride of the convolution. Default is 1.
             padding (int, optional): Zero-padding added to both sides of input. Default is 0.
+            name (str, optional): Layer name used in dispatch statistics.
+            channels_last (bool, optional): Take and produce NHWC activations. Default is False.
         """
         if isinstance(kernel_size, int):
             self.kernel_size = (kernel_size, kernel_size)
@@ -36,6 +60,8 @@ class Conv2D:
         self.out_channels = out_channels
         self.stride = stride
         self.padding = padding
+        self.name = name
+        self.channels_last = channels_last
 
         self.weights = np.random.randn(out_channels, in_channels, *self.kernel_size) * 0.1
         self.biases = np.zeros(out_channels)
@@ -45,21 +71,31 @@ class Conv2D:
 
         self.last_input = None
 
+        # Accelerator handle for weight-stationary inference
+        self.weight_handle = None
+        self._uploaded_weights = None
+
+        # Winograd-transformed filters, rebuilt when the weights change
+        self._winograd_U = None
+        self._winograd_weights = None
+
     def _pad_input(self, x):
         """
         Pads the input tensor with zeros if padding is specified.
 
         Args:
-            x (np.ndarray): Input tensor of shape (batch_size, in_channels, height, width).
+            x (np.ndarray): Input tensor of shape (batch_size, in_channels, height, width),
+                or (batch_size, height, width, in_channels) when channels_last.
 
         Returns:
             np.ndarray: Padded input tensor.
         """
         if self.padding == 0:
             return x
-        return np.pad(x, ((0, 0), (0, 0),
-                          (self.padding, self.padding),
-                          (self.padding, self.padding)), mode='constant')
+        pad = (self.padding, self.padding)
+        if self.channels_last:
+            return np.pad(x, ((0, 0), pad, pad, (0, 0)), mode='constant')
+        return np.pad(x, ((0, 0), (0, 0), pad, pad), mode='constant')
 
     def matrix_mul_sw(self, A, B):
         """
@@ -72,7 +108,8 @@ class Conv2D:
         Returns:
             np.ndarray: Resulting matrix of shape (M, N), flattened output feature maps.
         """
-        print(f"Matrix Mul SW: A shape: {A.shape}, B shape: {B.shape}")
+        if LOG_SW_GEMMS:
+            print(f"Matrix Mul SW: A shape: {A.shape}, B shape: {B.shape}")
         return np.dot(A, B)
 
     def matrix_add_bias(self, C, bias):
@@ -88,64 +125,273 @@ class Conv2D:
         """
         return C + bias
 
-    def forward(self, x):
+    def im2col(self, x):
         """
-        Performs the forward pass of the convolutional layer.
+        Unrolls every convolution window of the input into a row of the patch matrix.
 
         Args:
             x (np.ndarray): Input tensor of shape (batch_size, in_channels, height, width).
 
         Returns:
-            np.ndarray: Output tensor after convolution and bias addition.
+            tuple: (A, out_h, out_w) where A has shape (batch_size * out_h * out_w, K).
         """
-        self.last_input = x
+        if self.channels_last:
+            return self.im2col_nhwc(x)
+
         batch_size, _, in_h, in_w = x.shape
         kh, kw = self.kernel_size
         out_h = (in_h + 2 * self.padding - kh) // self.stride + 1
         out_w = (in_w + 2 * self.padding - kw) // self.stride + 1
 
-        x_padded = self._pad_input(x)
+        # (batch, in_channels, out_h, out_w, kh, kw) view of the padded input
+        windows = np.lib.stride_tricks.sliding_window_view(self._pad_input(x), (kh, kw), axis=(2, 3))
+        windows = windows[:, :, ::self.stride, ::self.stride][:, :, :out_h, :out_w]
+        # Each row is a flattened window in (in_channels, kh, kw) order
+        A = windows.transpose(0, 2, 3, 1, 4, 5).reshape(batch_size * out_h * out_w, -1)
+        return A, out_h, out_w
 
-        # Prepare matrix A: each row is a flattened window
-        A = []
-        for b in range(batch_size):
-            for i in range(out_h):
-                for j in range(out_w):
-                    h_start = i * self.stride
-                    w_start = j * self.stride
-                    window = x_padded[b, :, h_start:h_start+kh, w_start:w_start+kw]
-                    A.append(window.flatten())
-        A = np.array(A)  # Shape: (batch_size * out_h * out_w, K)
+    def im2col_nhwc(self, x):
+        """
+        im2col for channels-last input.
+
+        Every window is kh x kw runs of in_channels contiguous values, so the rows
+        are gathered with one strided copy in (kh, kw, in_channels) order.
+
+        Args:
+            x (np.ndarray): Input tensor of shape (batch_size, height, width, in_channels).
+
+        Returns:
+            tuple: (A, out_h, out_w) where A has shape (batch_size * out_h * out_w, K).
+        """
+        batch_size, in_h, in_w, _ = x.shape
+        kh, kw = self.kernel_size
+        out_h = (in_h + 2 * self.padding - kh) // self.stride + 1
+        out_w = (in_w + 2 * self.padding - kw) // self.stride + 1
+
+        # (batch, out_h, out_w, in_channels, kh, kw) view of the padded input
+        windows = np.lib.stride_tricks.sliding_window_view(self._pad_input(x), (kh, kw), axis=(1, 2))
+        windows = windows[:, ::self.stride, ::self.stride][:, :out_h, :out_w]
+        A = windows.transpose(0, 1, 2, 4, 5, 3).reshape(batch_size * out_h * out_w, -1)
+        return A, out_h, out_w
+
+    def filter_matrix(self):
+        """
+        Flattens the kernels into the B operand of the convolution GEMM.
+
+        The row order matches im2col: (in_channels, kh, kw), or (kh, kw, in_channels)
+        when channels_last. The matrix is C-contiguous in both layouts: OpenBLAS runs
+        small GEMMs against a transposed B with a different kernel, so a GEMM over a
+        subset of the rows of A would not reproduce those rows of the full product.
+
+        Returns:
+            np.ndarray: Matrix of shape (K, out_channels), one filter per column.
+        """
+        if self.channels_last:
+            return self.weights.transpose(2, 3, 1, 0).reshape(-1, self.out_channels)
+        return np.ascontiguousarray(self.weights.reshape(self.out_channels, -1).T)
+
+    def reshape_output(self, C, batch_size, out_h, out_w):
+        """
+        Converts the GEMM result back into a feature map.
+
+        Args:
+            C (np.ndarray): Matrix of shape (batch_size * out_h * out_w, out_channels).
+            batch_size (int): Number of images in the batch.
+            out_h (int): Output height.
+            out_w (int): Output width.
+
+        Returns:
+            np.ndarray: Tensor of shape (batch_size, out_channels, out_h, out_w), or a
+            (batch_size, out_h, out_w, out_channels) view of C when channels_last.
+        """
+        C = C.reshape(batch_size, out_h, out_w, self.out_channels)
+        if self.channels_last:
+            return C
+        return C.transpose(0, 3, 1, 2)  # to (batch_size, out_channels, out_h, out_w)
+
+    def resident_weights(self):
+        """
+        Uploads the filter matrix to the accelerator once and returns its handle.
+
+        The weights are uploaded again only if they were replaced (e.g. by loading a
+        model) or updated by a backward pass since the last upload.
+
+        Returns:
+            int: Weight handle for matrix_mul_hw_resident.
+        """
+        if self.weight_handle is None or self._uploaded_weights is not self.weights:
+            if self.weight_handle is not None:
+                release_weights(self.weight_handle)
+            self.weight_handle = upload_weights(self.filter_matrix())
+            self._uploaded_weights = self.weights
+        return self.weight_handle
+
+    def weights_updated(self):
+        """
+        Drops copies derived from the weights after they were modified in place.
+
+        Must be called by anything that updates `weights` without replacing the array.
+        """
+        self._uploaded_weights = None
+        self._winograd_weights = None
+
+    def matmul(self, A, B, tag=None):
+        """
+        Dispatches a matrix multiplication to software or hardware according to MODE.
+
+        Args:
+            A (np.ndarray): Matrix of shape (M, K).
+            B (np.ndarray): Matrix of shape (K, N).
+            tag (str, optional): Statistics tag. Defaults to the layer name.
+
+        Returns:
+            np.ndarray: Resulting matrix of shape (M, N).
+        """
+        backend = self.matrix_mul_sw if MODE == "train" else "hw"
+        return matmul_dispatch.matmul(A, B, backend=backend, tag=tag or self.name)
+
+    def use_winograd(self):
+        """
+        Decides whether the forward pass runs Winograd F(2x2, 3x3).
+
+        With CONV_ALGORITHM set to "auto", Winograd is chosen for 3x3 stride-1 layers
+        whose GEMMs run in software. On the accelerator every GEMM is a separate job
+        with a fixed launch cost, so the single im2col GEMM is kept there unless
+        CONV_ALGORITHM is "winograd".
+
+        Returns:
+            bool: True if the Winograd path applies.
+        """
+        eligible = self.kernel_size == (3, 3) and self.stride == 1
+        if CONV_ALGORITHM == "winograd":
+            return eligible
+        if CONV_ALGORITHM == "auto":
+            return eligible and MODE == "train"
+        return False
+
+    def winograd_filters(self):
+        """
+        Returns the transformed filters U = G g G^T, cached until the weights change.
+
+        Returns:
+            np.ndarray: Array of shape (16, in_channels, out_channels), one GEMM operand per tile position.
+        """
+        if self._winograd_weights is not self.weights:
+            # (out, in, 3, 3) -> (4, 4, in, out)
+            U = np.einsum('aj,oijk,bk->abio', WINOGRAD_G, self.weights, WINOGRAD_G)
+            self._winograd_U = U.reshape(16, self.in_channels, self.out_channels)
+            self._winograd_weights = self.weights
+        return self._winograd_U
+
+    def winograd_forward(self, x):
+        """
+        Convolution with Winograd minimal filtering F(2x2, 3x3).
+
+        The padded input is cut into overlapping 4x4 tiles that each produce a 2x2
+        output block. The element-wise products of the transformed tiles and filters
+        are batched over tiles and channels into 16 GEMMs of shape
+        (tiles, in_channels) x (in_channels, out_channels), which go through the same
+        matmul dispatch as the im2col path.
+
+        Args:
+            x (np.ndarray): Input tensor of shape (batch_size, in_channels, height, width),
+                or (batch_size, height, width, in_channels) when channels_last.
+
+        Returns:
+            np.ndarray: Output tensor of shape (batch_size, out_channels, out_h, out_w)
+            (channels last when channels_last), without bias.
+        """
+        if self.channels_last:
+            batch_size, in_h, in_w, _ = x.shape
+        else:
+            batch_size, _, in_h, in_w = x.shape
+        out_h = in_h + 2 * self.padding - 2
+        out_w = in_w + 2 * self.padding - 2
+        tiles_h = (out_h + 1) // 2
+        tiles_w = (out_w + 1) // 2
+
+        # Pad so the tiles cover the output exactly (extra zeros for odd sizes)
+        pad_h = (self.padding, 2 * tiles_h + 2 - in_h - self.padding)
+        pad_w = (self.padding, 2 * tiles_w + 2 - in_w - self.padding)
+
+        # Overlapping 4x4 tiles with stride 2, then V = BT d B laid out as (16, tiles, in_channels)
+        if self.channels_last:
+            x_padded = np.pad(x, ((0, 0), pad_h, pad_w, (0, 0)), mode='constant')
+            d = np.lib.stride_tricks.sliding_window_view(x_padded, (4, 4), axis=(1, 2))[:, ::2, ::2]
+            V = np.einsum('ai,btucij,dj->adbtuc', WINOGRAD_BT, d, WINOGRAD_BT)
+        else:
+            x_padded = np.pad(x, ((0, 0), (0, 0), pad_h, pad_w), mode='constant')
+            d = np.lib.stride_tricks.sliding_window_view(x_padded, (4, 4), axis=(2, 3))[:, :, ::2, ::2]
+            V = np.einsum('ai,bctuij,dj->adbtuc', WINOGRAD_BT, d, WINOGRAD_BT)
+        V = V.reshape(16, -1, self.in_channels)
+
+        U = self.winograd_filters()
+        M = np.stack([self.matmul(V[e], U[e], tag=f"{self.name}.winograd") for e in range(16)])
+
+        # Y = AT M A, back to the activation layout
+        M = M.reshape(4, 4, batch_size, tiles_h, tiles_w, self.out_channels)
+        if self.channels_last:
+            Y = np.einsum('ai,ijbtuo,cj->btauco', WINOGRAD_AT, M, WINOGRAD_AT)
+            Y = Y.reshape(batch_size, 2 * tiles_h, 2 * tiles_w, self.out_channels)
+            return Y[:, :out_h, :out_w]
+        Y = np.einsum('ai,ijbtuo,cj->botauc', WINOGRAD_AT, M, WINOGRAD_AT)
+        Y = Y.reshape(batch_size, self.out_channels, 2 * tiles_h, 2 * tiles_w)
+        return Y[:, :, :out_h, :out_w]
+
+    def forward(self, x):
+        """
+        Performs the forward pass of the convolutional layer.
+
+        Args:
+            x (np.ndarray): Input tensor of shape (batch_size, in_channels, height, width),
+                or (batch_size, height, width, in_channels) when channels_last.
+
+        Returns:
+            np.ndarray: Output tensor after convolution and bias addition, in the input's layout.
+        """
+        self.last_input = x
+
+        if self.use_winograd():
+            if self.channels_last:
+                return self.winograd_forward(x) + self.biases
+            return self.winograd_forward(x) + self.biases.reshape(1, -1, 1, 1)
+
+        A, out_h, out_w = self.im2col(x)
 
         # Prepare matrix B: each column is a flattened filter
-        B = self.weights.reshape(self.out_channels, -1).T  # Shape: (K, out_channels)
+        B = self.filter_matrix()  # Shape: (K, out_channels)
 
         # Multiply
-        if (MODE == "train"):
-            C = self.matrix_mul_sw(A, B)  # Shape: (batch_size * out_h * out_w, out_channels)
+        if (MODE != "train") and WEIGHT_STATIONARY and matmul_dispatch.BACKEND is None:
+            handle = self.resident_weights()
+            C = matmul_dispatch.matmul(A, B, backend=lambda A_c, B_c: matrix_mul_hw_resident(A_c, handle),
+                                       tag=self.name, skip_columns=False)
         else:
-            C = matrix_mul_hw(A, B)  # Shape: (batch_size * out_h * out_w, out_channels)
+            C = self.matmul(A, B)  # Shape: (batch_size * out_h * out_w, out_channels)
 
         # Add bias
         C = self.matrix_add_bias(C, self.biases)  # shape: (M, N)
 
         # Reshape back to (batch_size, out_channels, out_h, out_w)
-        C = C.reshape(batch_size, out_h, out_w, self.out_channels)
-        C = C.transpose(0, 3, 1, 2)  # to (batch_size, out_channels, out_h, out_w)
-        return C
+        return self.reshape_output(C, x.shape[0], out_h, out_w)
 
 
     def backward(self, d_out, learning_rate):
         """
         Performs the backward pass, computing gradients and updating weights.
 
+        The gradients are kept in grad_w / grad_b. With learning_rate None the
+        weights are left untouched (gradient-only pass, e.g. for data-parallel workers).
+
         Args:
             d_out (np.ndarray): Gradient of the loss with respect to the output.
-            learning_rate (float): Learning rate for parameter updates.
+            learning_rate (float or None): Learning rate for parameter updates.
 
         Returns:
             np.ndarray: Gradient of the loss with respect to the input.
         """
+        if self.channels_last:
+            raise RuntimeError(f"{self.name}: channels-last layout is inference-only")
         x = self.last_input
         batch_size, _, in_h, in_w = x.shape
         kh, kw = self.kernel_size
@@ -174,8 +420,13 @@ class Conv2D:
         else:
             d_x = d_x_padded
 
+        self.grad_w = d_w
+        self.grad_b = d_b
+
         # Update weights and biases
-        self.weights -= learning_rate * d_w
-        self.biases -= learning_rate * d_b
+        if learning_rate is not None:
+            self.weights -= learning_rate * d_w
+            self.biases -= learning_rate * d_b
+            self.weights_updated()
 
         return d_x
@@ -1,4 +1,6 @@
 import numpy as np
+import conv2d
+import matmul_dispatch
 
 class Dense:
     """
@@ -7,18 +9,24 @@ class Dense:
     Attributes:
         weights (np.ndarray): Weight matrix of shape (input_size, output_size).
         biases (np.ndarray): Bias vector of shape (output_size,).
+        name (str): Layer name used in dispatch statistics.
     """
-    def __init__(self, input_size, output_size):
+    def __init__(self, input_size, output_size, name=None):
         """
         Initializes the Dense layer with random weights and zero biases.
 
         Args:
             input_size (int): Number of input features.
             output_size (int): Number of output features.
+            name (str, optional): Layer name used in dispatch statistics.
         """
         # Weight initialization
         self.weights = np.random.randn(input_size, output_size) * 0.01
         self.biases = np.zeros(output_size)
+        self.name = name
+
+        self.grad_w = np.zeros_like(self.weights)
+        self.grad_b = np.zeros_like(self.biases)
 
         # Cache for backprop
         self.last_input = None
@@ -28,6 +36,8 @@ class Dense:
         """
         Computes the dot product of A and B, then adds C.
 
+        All-zero rows and columns of A (common after ReLU) are skipped.
+
         Args:
             A (np.ndarray): Input matrix.
             B (np.ndarray): Weight matrix.
@@ -36,8 +46,25 @@ class Dense:
         Returns:
             np.ndarray: Result of (A @ B) + C.
         """
-        return np.dot(A, B) + C
-    
+        return matmul_dispatch.matmul(A, B, C, backend="sw", tag=self.name)
+
+    def hw_dot(self, A, B, C):
+        """
+        Computes (A @ B) + C on the accelerator, with C added on the host.
+
+        The weight matrix is tiled to the accelerator capacity; GEMMs too small to be
+        worth a hardware job fall back to BLAS (see matmul_dispatch.HW_MIN_MACS).
+
+        Args:
+            A (np.ndarray): Input matrix.
+            B (np.ndarray): Weight matrix.
+            C (np.ndarray): Bias vector.
+
+        Returns:
+            np.ndarray: Result of (A @ B) + C.
+        """
+        return matmul_dispatch.matmul(A, B, C, backend="hw", tag=self.name)
+
     def forward(self, x):
         """
         Performs the forward pass of the dense layer.
@@ -49,8 +76,11 @@ class Dense:
             np.ndarray: Output tensor of shape (batch_size, output_size).
         """
         self.last_input = x
-        # output = np.dot(x, self.weights) + self.biases
-        output = self.sw_dot(x, self.weights, self.biases)
+        # Same software/hardware split as Conv2D
+        if conv2d.MODE == "train":
+            output = self.sw_dot(x, self.weights, self.biases)
+        else:
+            output = self.hw_dot(x, self.weights, self.biases)
         self.last_output = output
         return output
 
@@ -58,19 +88,145 @@ class Dense:
         """
         Performs the backward pass, computing gradients and updating weights.
 
+        The gradients are kept in grad_w / grad_b; with learning_rate None the
+        weights are not updated.
+
         Args:
             d_out (np.ndarray): Gradient of the loss with respect to the output (batch_size, output_size).
-            learning_rate (float): Learning rate for parameter updates.
+            learning_rate (float or None): Learning rate for parameter updates.
 
         Returns:
             np.ndarray: Gradient of the loss with respect to the input.
         """
-        d_input = np.dot(d_out, self.weights.T)
-        d_weights = np.dot(self.last_input.T, d_out)
+        backend = "sw" if conv2d.MODE == "train" else "hw"
+        d_input = matmul_dispatch.matmul(d_out, self.weights.T, backend=backend, tag=f"{self.name}.backward")
+        # Zero input features (post-ReLU) become zero rows here and are skipped
+        d_weights = matmul_dispatch.matmul(self.last_input.T, d_out, backend=backend, tag=f"{self.name}.backward")
         d_biases = np.sum(d_out, axis=0)
 
+        self.grad_w = d_weights
+        self.grad_b = d_biases
+
         # Update weights and biases
-        self.weights -= learning_rate * d_weights
-        self.biases -= learning_rate * d_biases
+        if learning_rate is not None:
+            self.weights -= learning_rate * d_weights
+            self.biases -= learning_rate * d_biases
+
+        return d_input
+
+class LowRankDense(Dense):
+    """
+    Dense layer whose weight matrix is stored as a rank-r product u @ v.
+
+    Drop-in replacement for Dense: x @ u runs first, then (x @ u) @ v + b, which
+    costs r * (input_size + output_size) MACs per sample instead of
+    input_size * output_size.
+
+    Attributes:
+        u (np.ndarray): Left factor of shape (input_size, rank).
+        v (np.ndarray): Right factor of shape (rank, output_size).
+        biases (np.ndarray): Bias vector of shape (output_size,).
+        name (str): Layer name used in dispatch statistics.
+    """
+    def __init__(self, u, v, biases, name=None):
+        """
+        Initializes the layer from its factors.
+
+        Args:
+            u (np.ndarray): Left factor of shape (input_size, rank).
+            v (np.ndarray): Right factor of shape (rank, output_size).
+            biases (np.ndarray): Bias vector of shape (output_size,).
+            name (str, optional): Layer name used in dispatch statistics.
+        """
+        self.u = u
+        self.v = v
+        self.biases = biases
+        self.name = name
+
+        self.grad_u = np.zeros_like(u)
+        self.grad_v = np.zeros_like(v)
+        self.grad_b = np.zeros_like(biases)
+
+        # Cache for backprop
+        self.last_input = None
+        self.last_hidden = None
+        self.last_output = None
+
+    @classmethod
+    def from_dense(cls, dense, rank):
+        """
+        Factorizes a Dense layer by truncated SVD.
+
+        W = U S Vt is cut to the `rank` largest singular values, and sqrt(S) is
+        split between the two factors so they have the same scale.
+
+        Args:
+            dense (Dense): Layer to factorize.
+            rank (int): Number of singular values to keep.
+
+        Returns:
+            LowRankDense: Factored layer with the same biases (copied).
+        """
+        U, S, Vt = np.linalg.svd(dense.weights, full_matrices=False)
+        root = np.sqrt(S[:rank])
+        return cls(U[:, :rank] * root, root[:, None] * Vt[:rank], dense.biases.copy(), name=dense.name)
+
+    @property
+    def rank(self):
+        """
+        Number of kept singular values.
+        """
+        return self.u.shape[1]
+
+    @property
+    def weights(self):
+        """
+        Dense equivalent u @ v, for tools that need the full matrix.
+        """
+        return self.u @ self.v
+
+    def forward(self, x):
+        """
+        Performs the forward pass of the factored layer.
+
+        Args:
+            x (np.ndarray): Input tensor of shape (batch_size, input_size).
+
+        Returns:
+            np.ndarray: Output tensor of shape (batch_size, output_size).
+        """
+        self.last_input = x
+        dot = self.sw_dot if conv2d.MODE == "train" else self.hw_dot
+        self.last_hidden = dot(x, self.u, None)
+        output = dot(self.last_hidden, self.v, self.biases)
+        self.last_output = output
+        return output
+
+    def backward(self, d_out, learning_rate):
+        """
+        Performs the backward pass, computing gradients and updating both factors.
+
+        The gradients are kept in grad_u / grad_v / grad_b; with learning_rate None
+        the factors are not updated.
+
+        Args:
+            d_out (np.ndarray): Gradient of the loss with respect to the output (batch_size, output_size).
+            learning_rate (float or None): Learning rate for parameter updates.
+
+        Returns:
+            np.ndarray: Gradient of the loss with respect to the input.
+        """
+        backend = "sw" if conv2d.MODE == "train" else "hw"
+        tag = f"{self.name}.backward"
+        d_hidden = matmul_dispatch.matmul(d_out, self.v.T, backend=backend, tag=tag)
+        d_input = matmul_dispatch.matmul(d_hidden, self.u.T, backend=backend, tag=tag)
+        self.grad_v = matmul_dispatch.matmul(self.last_hidden.T, d_out, backend=backend, tag=tag)
+        self.grad_u = matmul_dispatch.matmul(self.last_input.T, d_hidden, backend=backend, tag=tag)
+        self.grad_b = np.sum(d_out, axis=0)
+
+        if learning_rate is not None:
+            self.u -= learning_rate * self.grad_u
+            self.v -= learning_rate * self.grad_v
+            self.biases -= learning_rate * self.grad_b
 
         return d_input
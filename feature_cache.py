@@ -0,0 +1,102 @@
+import os
+import hashlib
+import numpy as np
+
+# Directory holding one .npy memmap of conv3 features per (conv weights, dataset) pair
+CACHE_DIR = "feature_cache"
+
+def cache_key(model, X):
+    """
+    Hashes everything the flattened conv3 features depend on.
+
+    Args:
+        model (SimpleCNN): Model whose conv layers produce the features.
+        X (np.ndarray): Input images.
+
+    Returns:
+        str: Hex digest of the conv weights and biases, the layout and the images.
+    """
+    h = hashlib.sha256()
+    for conv in (model.conv1, model.conv2, model.conv3):
+        for p in (conv.weights, conv.biases):
+            h.update(repr((p.shape, p.dtype.str)).encode())
+            h.update(np.ascontiguousarray(p).tobytes())
+    h.update(model.layout.encode())
+    h.update(repr((X.shape, X.dtype.str)).encode())
+    h.update(np.ascontiguousarray(X).tobytes())
+    return h.hexdigest()
+
+def cached_features(model, X, batch_size=32, cache_dir=CACHE_DIR):
+    """
+    Returns the flattened conv3 features of X, computing them only on a cache miss.
+
+    Features are written batch by batch into a memmap, so the full feature matrix
+    never has to fit in memory, and renamed into place once complete.
+
+    Args:
+        model (SimpleCNN): Model with the (frozen) conv layers.
+        X (np.ndarray): Input images of shape (num_samples, 1, img_size, img_size).
+        batch_size (int, optional): Batch size of the conv pass. Default is 32.
+        cache_dir (str, optional): Cache directory. Default is CACHE_DIR.
+
+    Returns:
+        np.memmap: Read-only array of shape (num_samples, num_features).
+    """
+    path = os.path.join(cache_dir, f"{cache_key(model, X)}.npy")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        first = model.features(X[:batch_size])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        features = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=first.dtype,
+                                             shape=(len(X), first.shape[1]))
+        features[:len(first)] = first
+        for i in range(batch_size, len(X), batch_size):
+            features[i:i+batch_size] = model.features(X[i:i+batch_size])
+        features.flush()
+        del features
+        os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r")
+
+def train_head(model, features, y_onehot, epochs=1, lr=0.01, batch_size=16):
+    """
+    Trains dense1 and dense2 on precomputed conv features with mini-batch SGD.
+
+    Args:
+        model (SimpleCNN): Model whose head is trained in place.
+        features (np.ndarray): Flattened conv3 features, e.g. from cached_features().
+        y_onehot (np.ndarray): One-hot encoded labels.
+        epochs (int, optional): Number of epochs. Default is 1.
+        lr (float, optional): Learning rate. Default is 0.01.
+        batch_size (int, optional): Mini-batch size. Default is 16.
+
+    Returns:
+        list: Sum of the mini-batch cross-entropy losses per epoch.
+    """
+    losses = []
+    for _ in range(epochs):
+        permutation = np.random.permutation(len(features))
+        total_loss = 0.0
+        for i in range(0, len(features), batch_size):
+            batch = np.sort(permutation[i:i+batch_size])  # sorted reads from the memmap
+            output = model.head(features[batch])
+            total_loss += -np.sum(y_onehot[batch] * np.log(output + 1e-8)) / len(batch)
+            model.backward_head((output - y_onehot[batch]) / batch_size, lr)
+        losses.append(total_loss)
+    return losses
+
+def head_accuracy(model, features, y, batch_size=256):
+    """
+    Classification accuracy of the head on precomputed features.
+
+    Args:
+        model (SimpleCNN): Model to evaluate.
+        features (np.ndarray): Flattened conv3 features.
+        y (np.ndarray): Integer labels.
+        batch_size (int, optional): Batch size. Default is 256.
+
+    Returns:
+        float: Fraction of correct predictions.
+    """
+    preds = np.concatenate([np.argmax(model.head(features[i:i+batch_size]), axis=1)
+                            for i in range(0, len(features), batch_size)])
+    return float(np.mean(preds == y))
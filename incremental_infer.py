@@ -0,0 +1,230 @@
+import sys
+import time
+import numpy as np
+import conv2d
+from simple_cnn import SimpleCNN
+
+CONV_LAYERS = ("conv1", "conv2", "conv3")
+RELUS = {"conv1": "relu1", "conv2": "relu2", "conv3": "relu3"}
+
+class IncrementalCNN:
+    """
+    Frame-to-frame incremental inference for SimpleCNN.
+
+    Keeps the post-ReLU activations of every conv layer for the previous batch. A
+    new batch of the same shape is diffed against the previous input; each conv
+    layer then recomputes only the outputs whose receptive field covers a changed
+    value of its input. Outputs whose recomputed value did not change (e.g. still
+    zero after ReLU) stop the change from propagating further. The dense head runs
+    in full on the cached conv3 activations every frame.
+
+    Recomputed outputs use the im2col formulation and the head is the model's own,
+    so with conv2d.CONV_ALGORITHM = "im2col" the output equals a full forward exactly.
+
+    Attributes:
+        model (SimpleCNN): Model to run. Call reset() after changing its weights.
+        recomputed (dict): Layer name -> fraction of its outputs recomputed for the last batch.
+    """
+    def __init__(self, model):
+        """
+        Initializes the incremental runner.
+
+        Args:
+            model (SimpleCNN): Model to run.
+        """
+        self.model = model
+        self.reset()
+
+    def reset(self):
+        """
+        Drops the cached activations; the next forward() runs a full pass.
+        """
+        self.last_input = None
+        self.activations = {}
+        self.recomputed = {}
+
+    def _head(self):
+        """
+        Finishes the forward pass from the cached conv3 activations.
+
+        Returns:
+            np.ndarray: Output probabilities after softmax.
+        """
+        return self.model.head(self.model.flatten.forward(self.activations[CONV_LAYERS[-1]]))
+
+    def _full(self, x):
+        """
+        Runs every layer and caches the activations.
+
+        Args:
+            x (np.ndarray): Input in the model's layout.
+
+        Returns:
+            np.ndarray: Output probabilities after softmax.
+        """
+        for name in CONV_LAYERS:
+            conv = getattr(self.model, name)
+            # Own copy: the cache is updated in place
+            x = np.array(getattr(self.model, RELUS[name]).forward(conv.forward(x)))
+            self.activations[name] = x
+        self.recomputed = {name: 1.0 for name in CONV_LAYERS}
+        return self._head()
+
+    @staticmethod
+    def _output_mask(conv, in_mask):
+        """
+        Marks the conv outputs whose receptive field contains a changed input position.
+
+        Args:
+            conv (Conv2D): Layer.
+            in_mask (np.ndarray): Boolean (batch_size, height, width) mask of changed input positions.
+
+        Returns:
+            np.ndarray: Boolean (batch_size, out_h, out_w) mask.
+        """
+        kh, kw = conv.kernel_size
+        pad = (conv.padding, conv.padding)
+        padded = np.pad(in_mask, ((0, 0), pad, pad))
+        out_h = (padded.shape[1] - kh) // conv.stride + 1
+        out_w = (padded.shape[2] - kw) // conv.stride + 1
+        windows = np.lib.stride_tricks.sliding_window_view(padded, (kh, kw), axis=(1, 2))
+        windows = windows[:, ::conv.stride, ::conv.stride][:, :out_h, :out_w]
+        return windows.any(axis=(3, 4))
+
+    @staticmethod
+    def _im2col_rows(conv, x, b, i, j):
+        """
+        Builds the im2col rows of selected output positions only.
+
+        Args:
+            conv (Conv2D): Layer.
+            x (np.ndarray): Layer input in the layer's layout.
+            b, i, j (np.ndarray): Batch, row and column index of each output position.
+
+        Returns:
+            np.ndarray: Matrix of shape (len(b), K) in the row order of conv.filter_matrix().
+        """
+        kh, kw = conv.kernel_size
+        padded = conv._pad_input(x)
+        i, j = i * conv.stride, j * conv.stride
+        if conv.channels_last:
+            windows = np.lib.stride_tricks.sliding_window_view(padded, (kh, kw), axis=(1, 2))
+            # (n, C, kh, kw) -> (n, kh, kw, C)
+            return windows[b, i, j].transpose(0, 2, 3, 1).reshape(len(b), -1)
+        windows = np.lib.stride_tricks.sliding_window_view(padded, (kh, kw), axis=(2, 3))
+        return windows[b, :, i, j].reshape(len(b), -1)
+
+    def forward(self, x):
+        """
+        Runs inference, reusing the previous batch's activations where the input did not change.
+
+        Args:
+            x (np.ndarray): Input tensor of shape (batch_size, 1, img_size, img_size).
+
+        Returns:
+            np.ndarray: Output probabilities after softmax.
+        """
+        prev, self.last_input = self.last_input, np.array(x)
+        if self.model.layout == "NHWC":
+            x = x.transpose(0, 2, 3, 1)
+        if prev is None or prev.shape != self.last_input.shape:
+            return self._full(x)
+
+        mask = (self.last_input != prev).any(axis=1)
+        for name in CONV_LAYERS:
+            conv = getattr(self.model, name)
+            act = self.activations[name]
+            out_mask = self._output_mask(conv, mask)
+            self.recomputed[name] = float(out_mask.mean())
+            b, i, j = np.nonzero(out_mask)
+            if len(b):
+                A = self._im2col_rows(conv, x, b, i, j)
+                # NumPy runs a single-row product as matrix-vector, which sums in a
+                # different order than the full GEMM; a duplicated row keeps it a GEMM
+                rows = conv.matmul(np.repeat(A, 2, axis=0) if len(A) == 1 else A, conv.filter_matrix())[:len(A)]
+                rows = getattr(self.model, RELUS[name]).forward(conv.matrix_add_bias(rows, conv.biases))
+                old = act[b, i, j] if conv.channels_last else act[b, :, i, j]
+                # Only outputs that really changed propagate to the next layer
+                changed = (rows != old).any(axis=1)
+                b, i, j, rows = b[changed], i[changed], j[changed], rows[changed]
+                if conv.channels_last:
+                    act[b, i, j] = rows
+                else:
+                    act[b, :, i, j] = rows
+            mask = np.zeros(out_mask.shape, dtype=bool)
+            mask[b, i, j] = True
+            x = act
+        return self._head()
+
+def frame_sequence(first, num_frames, patch, seed=0):
+    """
+    Generates frames that differ from the previous one in a single square patch.
+
+    Args:
+        first (np.ndarray): First frame batch of shape (batch_size, 1, H, W).
+        num_frames (int): Number of frames including the first.
+        patch (int): Side of the changed patch.
+        seed (int, optional): Random seed. Default is 0.
+
+    Returns:
+        list: Frame batches.
+    """
+    rng = np.random.default_rng(seed)
+    frames = [first]
+    size = first.shape[-1]
+    for _ in range(num_frames - 1):
+        frame = frames[-1].copy()
+        r, c = rng.integers(0, size - patch + 1, size=2)
+        frame[:, :, r:r+patch, c:c+patch] = rng.random((first.shape[0], 1, patch, patch))
+        frames.append(frame)
+    return frames
+
+def compare(model, frames):
+    """
+    Prints full-forward against incremental time per frame and whether the outputs are identical.
+
+    Args:
+        model (SimpleCNN): Model to run.
+        frames (list): Frame batches from frame_sequence().
+    """
+    t0 = time.perf_counter()
+    full = [model.forward(frame) for frame in frames]
+    full_s = time.perf_counter() - t0
+
+    runner = IncrementalCNN(model)
+    t0 = time.perf_counter()
+    incremental, recomputed = [], []
+    for frame in frames:
+        incremental.append(runner.forward(frame))
+        recomputed.append(dict(runner.recomputed))
+    inc_s = time.perf_counter() - t0
+
+    mismatched = sum(not np.array_equal(a, b) for a, b in zip(full, incremental))
+    diff = max(np.max(np.abs(a - b)) for a, b in zip(full, incremental))
+    share = " ".join(f"{name} {np.mean([r[name] for r in recomputed[1:]]):6.1%}" for name in CONV_LAYERS)
+    print(f"full        {full_s / len(frames) * 1e3:8.2f}ms/frame")
+    print(f"incremental {inc_s / len(frames) * 1e3:8.2f}ms/frame  ({full_s / inc_s:.2f}x)")
+    print(f"outputs: {'identical' if not mismatched else f'{mismatched}/{len(frames)} frames differ'}"
+          f"  max diff {diff:.2e}")
+    print(f"recomputed outputs: {share}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python incremental_infer.py trained_model.pkl|img_size [patch] [frames]")
+        sys.exit(1)
+
+    # Software GEMMs; the im2col path is what incremental frames recompute
+    conv2d.MODE = "train"
+    conv2d.CONV_ALGORITHM = "im2col"
+    conv2d.LOG_SW_GEMMS = False
+
+    if sys.argv[1].isdigit():
+        model = SimpleCNN(int(sys.argv[1]))
+    else:
+        model = SimpleCNN()
+        model.load(sys.argv[1])
+    patch = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    num_frames = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    first = np.random.default_rng(1).random((1, 1, model.img_size, model.img_size))
+    compare(model, frame_sequence(first, num_frames, patch))
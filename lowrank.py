@@ -0,0 +1,128 @@
+import sys
+import numpy as np
+import conv2d
+from dense import LowRankDense
+from simple_cnn import SimpleCNN
+from quantize import evaluate
+from feature_cache import train_head
+
+def rank_for_energy(singular_values, energy):
+    """
+    Smallest rank whose singular values keep a fraction of the spectral energy.
+
+    Args:
+        singular_values (np.ndarray): Singular values in decreasing order.
+        energy (float): Fraction of sum(S**2) to keep, in (0, 1].
+
+    Returns:
+        int: Rank r such that sum(S[:r]**2) >= energy * sum(S**2).
+    """
+    cumulative = np.cumsum(singular_values ** 2)
+    return int(np.searchsorted(cumulative, energy * cumulative[-1]) + 1)
+
+def factorize(model, rank):
+    """
+    Returns a copy of the model with dense1 replaced by a rank-r LowRankDense.
+
+    Args:
+        model (SimpleCNN): Model with a full dense1.
+        rank (int): Number of singular values to keep.
+
+    Returns:
+        SimpleCNN: New model in the same layout; the conv and dense2 parameters are copied.
+    """
+    # Factorize the canonical (NCHW-ordered) dense1, then switch to the model's layout
+    compressed = SimpleCNN()
+    compressed.set_params({key: p.copy() for key, p in model.get_params().items()})
+    compressed.dense1 = LowRankDense.from_dense(compressed.dense1, rank)
+    compressed.set_layout(model.layout)
+    return compressed
+
+def rank_for_accuracy(model, X, y, max_drop, batch_size=32):
+    """
+    Smallest rank whose factored model stays within max_drop of the original accuracy.
+
+    Binary search over the rank; accuracy is treated as non-decreasing in the rank.
+
+    Args:
+        model (SimpleCNN): Model with a full dense1.
+        X (np.ndarray): Evaluation images.
+        y (np.ndarray): Integer labels.
+        max_drop (float): Largest accepted accuracy loss, e.g. 0.01.
+        batch_size (int, optional): Inference batch size. Default is 32.
+
+    Returns:
+        int: Selected rank.
+    """
+    target = evaluate(model, X, y, batch_size)[0] - max_drop
+    lo, hi = 1, min(model.dense1.weights.shape)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if evaluate(factorize(model, mid), X, y, batch_size)[0] >= target:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def fine_tune(model, X, y_onehot, epochs=1, lr=0.01, batch_size=16):
+    """
+    Fine-tunes the fully connected head (dense1 factors and dense2) with the conv layers frozen.
+
+    The conv features are computed once; every step then runs only the head.
+
+    Args:
+        model (SimpleCNN): Model to fine-tune in place.
+        X (np.ndarray): Training images.
+        y_onehot (np.ndarray): One-hot encoded labels.
+        epochs (int, optional): Number of epochs. Default is 1.
+        lr (float, optional): Learning rate. Default is 0.01.
+        batch_size (int, optional): Mini-batch size. Default is 16.
+    """
+    features = np.concatenate([model.features(X[i:i+batch_size]) for i in range(0, len(X), batch_size)], axis=0)
+    train_head(model, features, y_onehot, epochs, lr, batch_size)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python lowrank.py trained_model.pkl data_dir [energy:0.95|drop:0.01|rank:32] "
+              "[finetune_epochs] [lowrank_model.pkl]")
+        sys.exit(1)
+
+    from CNN_digit_recognizer import load_data, one_hot, LR
+
+    # Software GEMMs for a like-for-like comparison
+    conv2d.MODE = "train"
+
+    model = SimpleCNN()
+    model.load(sys.argv[1])
+    X, y = load_data(sys.argv[2], model.img_size)
+    criterion, _, value = (sys.argv[3] if len(sys.argv) > 3 else "energy:0.95").partition(":")
+    epochs = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    out_path = sys.argv[5] if len(sys.argv) > 5 else "lowrank_model.pkl"
+
+    if criterion == "energy":
+        rank = rank_for_energy(np.linalg.svd(model.dense1.weights, compute_uv=False), float(value))
+    elif criterion == "drop":
+        rank = rank_for_accuracy(model, X, y, float(value))
+    elif criterion == "rank":
+        rank = int(value)
+    else:
+        print(f"Unknown criterion '{criterion}', expected energy, drop or rank.")
+        sys.exit(1)
+
+    compressed = factorize(model, rank)
+    full_size = model.dense1.weights.size
+    low_size = compressed.dense1.u.size + compressed.dense1.v.size
+    print(f"dense1: rank {rank}, {full_size} -> {low_size} weights ({full_size / low_size:.1f}x smaller)")
+
+    base_acc, base_ips = evaluate(model, X, y)
+    low_acc, low_ips = evaluate(compressed, X, y)
+    print(f"{'model':<10} {'accuracy':>9} {'images/s':>10}")
+    print(f"{'original':<10} {base_acc:9.4f} {base_ips:10.1f}")
+    print(f"{'low-rank':<10} {low_acc:9.4f} {low_ips:10.1f}")
+    if epochs:
+        fine_tune(compressed, X, one_hot(y), epochs, LR)
+        tuned_acc, tuned_ips = evaluate(compressed, X, y)
+        print(f"{'fine-tuned':<10} {tuned_acc:9.4f} {tuned_ips:10.1f}")
+
+    compressed.save(out_path)
+    print(f"Low-rank model saved to '{out_path}'.")
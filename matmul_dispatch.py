@@ -0,0 +1,138 @@
+import numpy as np
+from functools import partial
+from matrix_hw_wrapper import matrix_mul_hw_tiled, matrix_mul_axi
+
+# Named matmul backends; layers may also pass a callable taking (A, B)
+BACKENDS = {
+    "sw": np.dot,
+    "hw": matrix_mul_hw_tiled,
+    "axi": partial(matrix_mul_hw_tiled, mul=matrix_mul_axi),
+}
+
+# Backends that run on the simulated accelerator
+HW_BACKENDS = ("hw", "axi")
+
+# GEMMs below this many MACs stay on BLAS: an accelerator job costs a simulator
+# launch plus bit-serial transfers regardless of its size
+HW_MIN_MACS = 4096
+
+# When set to a key of BACKENDS, overrides the backend requested by the layers.
+# "auto" picks the fastest backend per GEMM shape from the autotune.py cost table.
+BACKEND = None
+
+# Skip all-zero rows and columns of A before the backend sees them
+ZERO_SKIP = True
+# Below this fraction of skippable MACs the full GEMM is sent as is
+ZERO_SKIP_MIN_RATIO = 0.1
+
+# Per-layer counters: tag -> {"calls", "rows", "rows_skipped", "macs", "macs_skipped"}
+SKIP_STATS = {}
+
+def _record(tag, M, K, N, rows_kept, cols_kept, skipped):
+    """
+    Accumulates zero-skipping counters for one GEMM.
+
+    Args:
+        tag (str): Layer name the GEMM belongs to.
+        M (int): Rows of A.
+        K (int): Columns of A.
+        N (int): Columns of B.
+        rows_kept (int): Non-zero rows of A.
+        cols_kept (int): Non-zero columns among the kept rows.
+        skipped (bool): Whether the compacted GEMM was actually used.
+    """
+    stats = SKIP_STATS.setdefault(tag, {"calls": 0, "rows": 0, "rows_skipped": 0,
+                                        "macs": 0, "macs_skipped": 0})
+    stats["calls"] += 1
+    stats["rows"] += M
+    stats["macs"] += M * K * N
+    if skipped:
+        stats["rows_skipped"] += M - rows_kept
+        stats["macs_skipped"] += M * K * N - rows_kept * cols_kept * N
+
+def _backend_fn(backend, M, K, N):
+    """
+    Resolves a backend for a GEMM shape, keeping small GEMMs off the accelerator.
+
+    Args:
+        backend (str or callable): Key of BACKENDS, "auto" or a function (A, B) -> C.
+        M (int): Rows of A.
+        K (int): Columns of A.
+        N (int): Columns of B.
+
+    Returns:
+        callable: Function (A, B) -> C.
+    """
+    if not isinstance(backend, str):
+        return backend
+    if backend == "auto":
+        # Measured costs replace the HW_MIN_MACS rule
+        import autotune
+        return BACKENDS[autotune.choose(M, K, N)]
+    if backend in HW_BACKENDS and M * K * N < HW_MIN_MACS:
+        return BACKENDS["sw"]
+    return BACKENDS[backend]
+
+def matmul(A, B, bias=None, backend="sw", tag=None, skip_columns=True):
+    """
+    Computes A @ B (+ bias) on a backend, skipping all-zero rows and tiles of A.
+
+    Post-ReLU activations are mostly zero. All-zero rows of A are dropped, and so
+    are the columns that are zero in every remaining row (together with the
+    matching rows of B), so any all-zero tile of A never reaches the backend.
+    Skipped rows of C are filled with zeros plus bias.
+
+    Args:
+        A (np.ndarray): Matrix of shape (M, K).
+        B (np.ndarray): Matrix of shape (K, N).
+        bias (np.ndarray, optional): Bias vector of shape (N,) added to every row.
+        backend (str or callable, optional): Key of BACKENDS, "auto" or a function (A, B) -> C.
+            Default is "sw". "hw" and "axi" fall back to "sw" for GEMMs smaller than HW_MIN_MACS.
+        tag (str, optional): Layer name used for the skip statistics.
+        skip_columns (bool, optional): Also drop zero columns. Disable when B is fixed
+            on the backend (weight-stationary). Default is True.
+
+    Returns:
+        np.ndarray: Resulting matrix of shape (M, N).
+    """
+    if BACKEND is not None:
+        backend = BACKEND
+    M, K = A.shape
+    N = B.shape[1]
+
+    if not ZERO_SKIP:
+        C = _backend_fn(backend, M, K, N)(A, B)
+        return C if bias is None else C + bias
+
+    nz = A != 0
+    rows = np.flatnonzero(nz.any(axis=1))
+    cols = np.flatnonzero(nz[rows].any(axis=0)) if skip_columns else np.arange(K)
+    skip_ratio = 1.0 - (rows.size * cols.size) / float(M * K) if M * K else 0.0
+    skipped = skip_ratio >= ZERO_SKIP_MIN_RATIO
+    _record(tag, M, K, N, rows.size, cols.size, skipped)
+
+    if not skipped:
+        C = _backend_fn(backend, M, K, N)(A, B)
+        return C if bias is None else C + bias
+
+    C = np.zeros((M, N))
+    if rows.size:
+        A_c = A[rows] if cols.size == K else A[np.ix_(rows, cols)]
+        B_c = B if cols.size == K else B[cols]
+        C[rows] = _backend_fn(backend, rows.size, cols.size, N)(A_c, B_c)
+    return C if bias is None else C + bias
+
+def reset_skip_stats():
+    """
+    Clears the per-layer zero-skipping counters.
+    """
+    SKIP_STATS.clear()
+
+def print_skip_report():
+    """
+    Prints the fraction of rows and MACs skipped per layer.
+    """
+    for tag, stats in SKIP_STATS.items():
+        rows = stats["rows_skipped"] / stats["rows"] if stats["rows"] else 0.0
+        macs = stats["macs_skipped"] / stats["macs"] if stats["macs"] else 0.0
+        print(f"{str(tag):<16} calls {stats['calls']:4d}  rows skipped {rows:6.1%}  MACs skipped {macs:6.1%}")
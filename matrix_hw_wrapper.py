@@ -2,17 +2,82 @@ import numpy as np
 import subprocess
 import time
 import os
+import atexit
+import shutil
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 
-def matrix_mul_hw(A, B):
+# Simulator profiles selectable from Python. Each one is passed to the Makefile as
+# variable overrides and builds into its own SIM_BUILD directory, so a compiled
+# model (sim.vvp for Icarus, Vtop for Verilator) is built once and reused by every
+# later call until the RTL changes.
+SIM_PROFILES = {
+    "icarus": {"SIM": "icarus", "WAVES": "0"},
+    "icarus_waves": {"SIM": "icarus", "WAVES": "1"},
+    "verilator": {"SIM": "verilator", "WAVES": "0"},
+    "verilator_waves": {"SIM": "verilator", "WAVES": "1"},
+}
+SIM_PROFILE = "icarus"
+
+# Capacity of MatrixMul_top, passed to the Makefile as MAX_M/MAX_K/MAX_N
+HW_MAX_M = 100
+HW_MAX_K = 288
+HW_MAX_N = 64
+
+# Accelerator interfaces and the cocotb test module that drives each one
+INTERFACES = {
+    "spi": "test_matrix_mul_spi",
+    "axi": "test_matrix_mul_axi",
+}
+
+# Simulated times of the last job as reported by its testbench:
+# {"load_ns", "compute_ns", "readback_ns"}
+LAST_SIM_TIMING = {}
+
+# Seconds to wait for output_buffer.txt once the simulation has returned
+OUTPUT_TIMEOUT_S = 10
+
+# The simulator exchanges data through fixed files in the working directory,
+# so accelerator jobs are serialized on a single worker thread.
+_hw_executor = None
+
+def make_command(profile=None, module=None, interface="spi"):
     """
-    Performs matrix multiplication using hardware via a cocotb testbench.
+    Builds the 'make' invocation for a simulator profile.
 
-    Writes matrices A and B to 'input_buffer.txt', invokes the cocotb testbench using 'make',
-    waits for the result in 'output_buffer.txt', and reads the resulting matrix C.
+    Args:
+        profile (str, optional): Key of SIM_PROFILES. Defaults to SIM_PROFILE.
+        module (str, optional): cocotb test module to run instead of the Makefile default.
+        interface (str, optional): "spi" (MatrixMul_top) or "axi" (matrixmul_axi_wrapper).
+
+    Returns:
+        list: Command line for subprocess.
+    """
+    profile = profile or SIM_PROFILE
+    if profile not in SIM_PROFILES:
+        raise ValueError(f"Unknown simulator profile '{profile}', expected one of {sorted(SIM_PROFILES)}")
+    if interface not in INTERFACES:
+        raise ValueError(f"Unknown interface '{interface}', expected one of {sorted(INTERFACES)}")
+
+    dims = f"{HW_MAX_M}x{HW_MAX_K}x{HW_MAX_N}"
+    make_cmd = ["make", f"INTERFACE={interface}", f"SIM_BUILD=sim_build_{interface}_{profile}_{dims}",
+                f"MAX_M={HW_MAX_M}", f"MAX_K={HW_MAX_K}", f"MAX_N={HW_MAX_N}"]
+    make_cmd += [f"{key}={value}" for key, value in SIM_PROFILES[profile].items()]
+    make_cmd.append(f"MODULE={module or INTERFACES[interface]}")
+    return make_cmd
+
+def _run_job(A, B, make_cmd):
+    """
+    Runs one accelerator job through the buffer files.
+
+    Writes matrices A and B to 'input_buffer.txt', runs the simulation, waits for
+    'output_buffer.txt' and reads the resulting matrix C. The simulated load,
+    compute and readback times reported by the testbench are kept in LAST_SIM_TIMING.
 
     Args:
         A (np.ndarray): Input matrix of shape (M, K).
         B (np.ndarray): Input matrix of shape (K, N).
+        make_cmd (list): Simulation command from make_command().
 
     Returns:
         np.ndarray: Resulting matrix C of shape (M, N).
@@ -31,19 +96,343 @@ def matrix_mul_hw(A, B):
         f.write("A " + " ".join(map(str, A.flatten())) + "\n")
         f.write("B " + " ".join(map(str, B.flatten())) + "\n")
 
+    # Drop the previous result so a failed run cannot be mistaken for this one
+    if os.path.exists("output_buffer.txt"):
+        os.remove("output_buffer.txt")
+
     # Run cocotb testbench via Makefile
-    make_cmd = ["make"]
     subprocess.run(make_cmd, check=True)
 
     # Wait for output_buffer.txt
+    deadline = time.time() + OUTPUT_TIMEOUT_S
     while not os.path.exists("output_buffer.txt"):
+        if time.time() > deadline:
+            raise RuntimeError("Simulation finished without writing output_buffer.txt")
         time.sleep(0.1)
 
-    # Read result matrix C
+    # Read result matrix C and the optional timing line
     with open("output_buffer.txt", "r") as f:
         line = f.readline()
         assert line.startswith("C ")
         values = list(map(float, line.strip().split()[1:]))
         C = np.array(values).reshape(M, N)
+        timing = f.readline().split()
 
+    LAST_SIM_TIMING.clear()
+    if timing and timing[0] == "T":
+        LAST_SIM_TIMING.update(zip(("load_ns", "compute_ns", "readback_ns"), map(float, timing[1:4])))
     return C
+
+def matrix_mul_hw(A, B, profile=None):
+    """
+    Performs matrix multiplication using hardware via a cocotb testbench.
+
+    Writes matrices A and B to 'input_buffer.txt', invokes the cocotb testbench using 'make',
+    waits for the result in 'output_buffer.txt', and reads the resulting matrix C.
+
+    Args:
+        A (np.ndarray): Input matrix of shape (M, K).
+        B (np.ndarray): Input matrix of shape (K, N).
+        profile (str, optional): Simulator profile from SIM_PROFILES. Defaults to SIM_PROFILE.
+
+    Returns:
+        np.ndarray: Resulting matrix C of shape (M, N).
+    """
+    return _run_job(A, B, make_command(profile))
+
+def matrix_mul_axi(A, B, profile=None):
+    """
+    Performs matrix multiplication on the AXI4-Lite/BRAM wrapper via a cocotb testbench.
+
+    Drop-in replacement for matrix_mul_hw: the testbench `test_matrix_mul_axi.py`
+    writes A and B word by word into the wrapper's BRAMs over AXI4-Lite instead of
+    shifting them in bit-serially over SPI, then reads C back through the register map.
+
+    Args:
+        A (np.ndarray): Input matrix of shape (M, K).
+        B (np.ndarray): Input matrix of shape (K, N).
+        profile (str, optional): Simulator profile from SIM_PROFILES. Defaults to SIM_PROFILE.
+
+    Returns:
+        np.ndarray: Resulting matrix C of shape (M, N).
+    """
+    return _run_job(A, B, make_command(profile, interface="axi"))
+
+
+def matrix_mul_hw_tiled(A, B, profile=None, mul=matrix_mul_hw):
+    """
+    Hardware matrix multiplication for operands larger than the accelerator.
+
+    A is split into (HW_MAX_M x HW_MAX_K) tiles and B into (HW_MAX_K x HW_MAX_N) tiles.
+    Each tile product runs as one accelerator job, and the partial sums along K are
+    accumulated on the host. Shapes that already fit run as a single job.
+
+    Args:
+        A (np.ndarray): Input matrix of shape (M, K).
+        B (np.ndarray): Input matrix of shape (K, N).
+        profile (str, optional): Simulator profile from SIM_PROFILES. Defaults to SIM_PROFILE.
+        mul (callable, optional): Single-job function, matrix_mul_hw (default) or matrix_mul_axi.
+
+    Returns:
+        np.ndarray: Resulting matrix C of shape (M, N).
+    """
+    M, K = A.shape
+    K2, N = B.shape
+    if K != K2:
+        raise ValueError(f"Matrix shape mismatch: A is {A.shape}, B is {B.shape} (K != K2)")
+    if M <= HW_MAX_M and K <= HW_MAX_K and N <= HW_MAX_N:
+        return mul(A, B, profile)
+
+    C = np.zeros((M, N))
+    for m in range(0, M, HW_MAX_M):
+        for n in range(0, N, HW_MAX_N):
+            for k in range(0, K, HW_MAX_K):
+                C[m:m+HW_MAX_M, n:n+HW_MAX_N] += mul(A[m:m+HW_MAX_M, k:k+HW_MAX_K],
+                                                     B[k:k+HW_MAX_K, n:n+HW_MAX_N], profile)
+    return C
+
+def matrix_mul_hw_async(A, B, profile=None):
+    """
+    Submits a hardware matrix multiplication without blocking the caller.
+
+    The job runs `matmul_dispatch.matmul` with the "hw" backend on a background
+    worker while the caller keeps doing host-side work, so it gets the same tiling,
+    zero skipping and HW_MIN_MACS fallback as a synchronous call. Jobs are executed
+    one at a time in submission order. Wrap the result with `asyncio.wrap_future`
+    to await it from a coroutine.
+
+    Args:
+        A (np.ndarray): Input matrix of shape (M, K).
+        B (np.ndarray): Input matrix of shape (K, N).
+        profile (str, optional): Simulator profile from SIM_PROFILES. Defaults to SIM_PROFILE.
+
+    Returns:
+        concurrent.futures.Future: Future resolving to matrix C of shape (M, N).
+    """
+    global _hw_executor
+    if _hw_executor is None:
+        _hw_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="matrix_mul_hw")
+
+    # Imported here: matmul_dispatch imports this module
+    import matmul_dispatch
+    # A non-default profile needs its own tiled callable, which skips the HW_MIN_MACS rule
+    backend = "hw" if profile is None else partial(matrix_mul_hw_tiled, profile=profile)
+    # Snapshot the operands so the caller may reuse its buffers right away
+    return _hw_executor.submit(matmul_dispatch.matmul, np.array(A, copy=True), np.array(B, copy=True),
+                               backend=backend)
+
+
+class HWSession:
+    """
+    Long-running simulator session that keeps matrix B resident on the accelerator.
+
+    The cocotb testbench `test_matrix_mul_spi_session.py` stays alive and executes
+    jobs dropped into a spool directory. Weights are uploaded once under a handle
+    (SPI header tag 0x0B); each multiplication afterwards only streams A under tag
+    0x0A and reads C back, because the loader keeps B_loaded set when no new B
+    header arrives.
+
+    Attributes:
+        profile (str): Simulator profile from SIM_PROFILES.
+        spool_dir (str): Directory used to exchange job and result files.
+        resident (int): Handle of the weights currently held by the accelerator.
+        words_sent (int): 32-bit words sent over SPI during this session.
+    """
+    def __init__(self, profile=None, spool_dir="hw_session"):
+        """
+        Initializes the session; the simulator is launched on first use.
+
+        Args:
+            profile (str, optional): Simulator profile. Defaults to SIM_PROFILE.
+            spool_dir (str, optional): Job exchange directory. Default is 'hw_session'.
+        """
+        self.profile = profile
+        self.spool_dir = spool_dir
+        self.process = None
+        self.seq = 0
+        self.weights = {}
+        self.next_handle = 0
+        self.resident = None
+        self.words_sent = 0
+
+    def start(self):
+        """
+        Launches the session testbench if it is not already running.
+        """
+        if self.process is not None and self.process.poll() is None:
+            return
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+        os.makedirs(self.spool_dir)
+        self.seq = 0
+        self.resident = None
+        env = dict(os.environ, HW_SESSION_DIR=os.path.abspath(self.spool_dir))
+        self.process = subprocess.Popen(make_command(self.profile, module="test_matrix_mul_spi_session"), env=env)
+
+    def _run_job(self, lines):
+        """
+        Writes one job file and blocks until the testbench writes its result.
+
+        Args:
+            lines (list): Job description lines.
+
+        Returns:
+            list: Lines of the result file.
+        """
+        self.start()
+        job = os.path.join(self.spool_dir, f"job_{self.seq}.txt")
+        result = os.path.join(self.spool_dir, f"result_{self.seq}.txt")
+        self.seq += 1
+
+        # Write then rename so the testbench never reads a partial job
+        with open(job + ".tmp", "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(job + ".tmp", job)
+
+        while not os.path.exists(result):
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Simulator session exited with code {self.process.returncode}")
+            time.sleep(0.01)
+
+        with open(result, "r") as f:
+            out = f.read().split("\n")
+        os.remove(result)
+        if out[0].startswith("ERROR"):
+            raise RuntimeError(out[0])
+        return out
+
+    def upload_weights(self, B):
+        """
+        Registers matrix B and loads it into the accelerator.
+
+        Args:
+            B (np.ndarray): Weight matrix of shape (K, N).
+
+        Returns:
+            int: Handle identifying the weights in later calls.
+        """
+        K, N = B.shape
+        if K > HW_MAX_K or N > HW_MAX_N:
+            raise ValueError(f"Weights {B.shape} exceed accelerator capacity ({HW_MAX_K}, {HW_MAX_N})")
+
+        handle = self.next_handle
+        self.next_handle += 1
+        self.weights[handle] = np.array(B, copy=True)
+        self._load(handle)
+        return handle
+
+    def release_weights(self, handle):
+        """
+        Forgets the weights registered under a handle.
+
+        Args:
+            handle (int): Handle returned by upload_weights.
+        """
+        self.weights.pop(handle, None)
+        if self.resident == handle:
+            self.resident = None
+
+    def _load(self, handle):
+        """
+        Sends the weights of a handle over SPI, replacing the resident ones.
+
+        Args:
+            handle (int): Handle returned by upload_weights.
+        """
+        B = self.weights[handle]
+        K, N = B.shape
+        self._run_job(["OP LOAD_B", f"TAG {handle}", f"K {K}", f"N {N}",
+                       "B " + " ".join(map(str, B.flatten()))])
+        self.words_sent += 1 + K * N
+        self.resident = handle
+
+    def matmul(self, A, handle):
+        """
+        Multiplies A by resident weights, streaming A in row tiles of HW_MAX_M.
+
+        Args:
+            A (np.ndarray): Input matrix of shape (M, K).
+            handle (int): Handle returned by upload_weights.
+
+        Returns:
+            np.ndarray: Resulting matrix C of shape (M, N).
+        """
+        if handle not in self.weights:
+            raise ValueError(f"Unknown weight handle {handle}")
+        K, N = self.weights[handle].shape
+        if A.shape[1] != K:
+            raise ValueError(f"Matrix shape mismatch: A is {A.shape}, weights are {(K, N)}")
+
+        # The accelerator holds a single B; switching handles costs one upload
+        if self.resident != handle:
+            self._load(handle)
+
+        tiles = []
+        for start in range(0, A.shape[0], HW_MAX_M):
+            tile = A[start:start+HW_MAX_M]
+            out = self._run_job(["OP MUL", f"TAG {handle}", f"M {tile.shape[0]}", f"K {K}", f"N {N}",
+                                 "A " + " ".join(map(str, tile.flatten()))])
+            assert out[0].startswith("C ")
+            tiles.append(np.array(list(map(float, out[0].split()[1:]))).reshape(tile.shape[0], N))
+            self.words_sent += 1 + tile.size
+        return np.concatenate(tiles, axis=0)
+
+    def close(self):
+        """
+        Stops the session testbench.
+        """
+        if self.process is None or self.process.poll() is not None:
+            return
+        self._run_job(["OP QUIT"])
+        self.process.wait()
+
+
+_hw_session = None
+
+def get_hw_session():
+    """
+    Returns the shared HWSession, creating it on first use.
+
+    Returns:
+        HWSession: Session used by upload_weights and matrix_mul_hw_resident.
+    """
+    global _hw_session
+    if _hw_session is None:
+        _hw_session = HWSession()
+        atexit.register(_hw_session.close)
+    return _hw_session
+
+def upload_weights(B):
+    """
+    Uploads a weight matrix once to the shared session and returns its handle.
+
+    Args:
+        B (np.ndarray): Weight matrix of shape (K, N).
+
+    Returns:
+        int: Weight handle for matrix_mul_hw_resident.
+    """
+    return get_hw_session().upload_weights(B)
+
+def release_weights(handle):
+    """
+    Releases a weight handle of the shared session.
+
+    Args:
+        handle (int): Handle returned by upload_weights.
+    """
+    get_hw_session().release_weights(handle)
+
+def matrix_mul_hw_resident(A, handle):
+    """
+    Hardware matrix multiplication against weights already resident on the accelerator.
+
+    Only A is sent over SPI; B was transferred once by upload_weights.
+
+    Args:
+        A (np.ndarray): Input matrix of shape (M, K).
+        handle (int): Handle returned by upload_weights.
+
+    Returns:
+        np.ndarray: Resulting matrix C of shape (M, N).
+    """
+    return get_hw_session().matmul(A, handle)
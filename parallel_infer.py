@@ -0,0 +1,208 @@
+import os
+import sys
+import time
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import matmul_dispatch
+from simple_cnn import SimpleCNN
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # optional: only needed to cap BLAS threads in thread mode
+    threadpool_limits = None
+
+# Environment variables read by the common BLAS/OpenMP runtimes at import time
+BLAS_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+_worker_model = None
+_thread_state = threading.local()
+
+def _load_model(model_file):
+    """
+    Loads a model for a worker.
+
+    Args:
+        model_file (str): Path of the trained model.
+
+    Returns:
+        SimpleCNN: Loaded model.
+    """
+    model = SimpleCNN()
+    model.load(model_file)
+    return model
+
+def _init_process(model_file):
+    """
+    Process pool initializer: loads the model once per worker process.
+
+    Workers run software GEMMs: the hardware simulator exchanges data through
+    fixed files, so concurrent workers must not share it.
+
+    Args:
+        model_file (str): Path of the trained model.
+    """
+    global _worker_model
+    matmul_dispatch.BACKEND = "sw"
+    _worker_model = _load_model(model_file)
+
+def _process_shard(x):
+    """
+    Runs the worker process's model on one shard.
+
+    Args:
+        x (np.ndarray): Shard of the input batch.
+
+    Returns:
+        np.ndarray: Output probabilities for the shard.
+    """
+    return _worker_model.forward(x)
+
+class ParallelInference:
+    """
+    Batch inference that shards the input across a pool of workers.
+
+    Each worker owns a copy of the model (layers cache activations, so models are
+    not shared between threads). The BLAS thread budget per worker defaults to
+    cores // workers so workers x BLAS threads does not oversubscribe the host.
+
+    Attributes:
+        workers (int): Number of pool workers.
+        blas_threads (int): BLAS threads per worker.
+        executor (str): "process" or "thread".
+    """
+    def __init__(self, model_file, workers=None, blas_threads=None, executor="process"):
+        """
+        Starts the worker pool.
+
+        Args:
+            model_file (str): Path of the trained model.
+            workers (int, optional): Pool size. Defaults to the number of cores.
+            blas_threads (int, optional): BLAS threads per worker. Defaults to cores // workers.
+            executor (str, optional): "process" (default) or "thread".
+        """
+        cores = os.cpu_count() or 1
+        self.model_file = model_file
+        self.workers = workers or cores
+        self.blas_threads = blas_threads or max(1, cores // self.workers)
+        self.executor = executor
+
+        if executor == "process":
+            # Spawned workers import NumPy fresh and read the thread budget from the
+            # environment they inherit; forked ones would keep the parent's BLAS pool.
+            saved = {var: os.environ.get(var) for var in BLAS_ENV_VARS}
+            for var in BLAS_ENV_VARS:
+                os.environ[var] = str(self.blas_threads)
+            try:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                mp_context=multiprocessing.get_context("spawn"),
+                                                initializer=_init_process,
+                                                initargs=(model_file,))
+                # Start every worker now so model loading is not timed as inference
+                for future in [self.pool.submit(os.getpid) for _ in range(self.workers)]:
+                    future.result()
+            finally:
+                for var, value in saved.items():
+                    if value is None:
+                        os.environ.pop(var, None)
+                    else:
+                        os.environ[var] = value
+        elif executor == "thread":
+            if threadpool_limits is None:
+                print("threadpoolctl is not installed; BLAS threads are not limited in thread mode.")
+                self.limiter = None
+            else:
+                # The limit is process-wide but applies to every GEMM on its own: each of
+                # the `workers` concurrent calls gets blas_threads, cores in total
+                self.limiter = threadpool_limits(limits=self.blas_threads, user_api="blas")
+            # Threads run in this process: force software GEMMs until close()
+            self.saved_backend = matmul_dispatch.BACKEND
+            matmul_dispatch.BACKEND = "sw"
+            self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="infer")
+        else:
+            raise ValueError(f"Unknown executor '{executor}', expected 'process' or 'thread'")
+
+    def _thread_shard(self, x):
+        """
+        Runs a shard on the calling thread's own model copy.
+
+        Args:
+            x (np.ndarray): Shard of the input batch.
+
+        Returns:
+            np.ndarray: Output probabilities for the shard.
+        """
+        if getattr(_thread_state, "model", None) is None:
+            _thread_state.model = _load_model(self.model_file)
+        return _thread_state.model.forward(x)
+
+    def forward(self, X, shard_size=None):
+        """
+        Runs inference on a batch split into shards.
+
+        Args:
+            X (np.ndarray): Input tensor of shape (num_samples, 1, IMG_SIZE, IMG_SIZE).
+            shard_size (int, optional): Images per task. Defaults to an even split over the workers.
+
+        Returns:
+            np.ndarray: Output probabilities of shape (num_samples, num_classes).
+        """
+        shard_size = shard_size or max(1, -(-len(X) // self.workers))
+        shards = [X[i:i+shard_size] for i in range(0, len(X), shard_size)]
+        fn = _process_shard if self.executor == "process" else self._thread_shard
+        return np.concatenate(list(self.pool.map(fn, shards)), axis=0)
+
+    def close(self):
+        """
+        Shuts the worker pool down.
+
+        In thread mode this also restores the BLAS limits and the matmul backend
+        that were in effect before the pool was created.
+        """
+        self.pool.shutdown()
+        if self.executor == "thread":
+            matmul_dispatch.BACKEND = self.saved_backend
+            if self.limiter is not None:
+                self.limiter.restore_original_limits()
+
+def scaling_report(model_file, X, max_workers=None, executor="process", repeats=3):
+    """
+    Prints inference time, speedup and parallel efficiency from 1 to N workers.
+
+    Args:
+        model_file (str): Path of the trained model.
+        X (np.ndarray): Input batch.
+        max_workers (int, optional): Largest pool size. Defaults to the number of cores.
+        executor (str, optional): "process" or "thread".
+        repeats (int, optional): Timed runs per pool size; the best one is reported.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    print(f"{'workers':>7} {'blas':>5} {'time (s)':>9} {'images/s':>9} {'speedup':>8} {'efficiency':>10}")
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        runner = ParallelInference(model_file, workers=workers, executor=executor)
+        runner.forward(X[:workers])  # warm-up
+        best = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            runner.forward(X)
+            best = min(best, time.perf_counter() - t0)
+        runner.close()
+
+        baseline = baseline or best
+        speedup = baseline / best
+        print(f"{workers:7d} {runner.blas_threads:5d} {best:9.3f} {len(X) / best:9.1f} "
+              f"{speedup:7.2f}x {speedup / workers:10.1%}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python parallel_infer.py data_dir [max_workers] [process|thread]")
+        sys.exit(1)
+
+    from CNN_digit_recognizer import MODEL_FILE, load_data
+
+    X, _ = load_data(sys.argv[1])
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    executor = sys.argv[3] if len(sys.argv) > 3 else "process"
+    scaling_report(MODEL_FILE, X, max_workers, executor)
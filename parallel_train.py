@@ -0,0 +1,247 @@
+import sys
+import time
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+import conv2d
+from simple_cnn import SimpleCNN
+
+def _create_shared(arrays):
+    """
+    Copies arrays into new shared-memory blocks.
+
+    Args:
+        arrays (dict): Name -> np.ndarray.
+
+    Returns:
+        tuple: (blocks, views, specs) where views are arrays backed by the blocks and
+        specs (name -> (block name, shape, dtype)) let other processes attach to them.
+    """
+    blocks, views, specs = {}, {}, {}
+    for name, arr in arrays.items():
+        block = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)
+        view[...] = arr
+        blocks[name], views[name] = block, view
+        specs[name] = (block.name, arr.shape, arr.dtype.str)
+    return blocks, views, specs
+
+def _attach_shared(specs):
+    """
+    Attaches to shared-memory blocks created by _create_shared.
+
+    Args:
+        specs (dict): Name -> (block name, shape, dtype).
+
+    Returns:
+        tuple: (blocks, views).
+    """
+    blocks, views = {}, {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks[name] = block
+        views[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return blocks, views
+
+def _worker(conn, param_specs, grad_specs, data_specs, log_sw_gemms):
+    """
+    Data-parallel worker loop.
+
+    Reads the weights straight from shared memory, computes gradients for the
+    sample indices it receives and writes them into its own gradient slot.
+
+    Args:
+        conn (multiprocessing.Connection): Pipe to the main process.
+        param_specs (dict): Shared parameter blocks.
+        grad_specs (dict): This worker's shared gradient blocks.
+        data_specs (dict): Shared 'X' and 'y' blocks.
+        log_sw_gemms (bool): The parent's conv2d.LOG_SW_GEMMS; spawned workers re-import conv2d.
+    """
+    conv2d.MODE = "train"
+    conv2d.LOG_SW_GEMMS = log_sw_gemms
+    param_blocks, params = _attach_shared(param_specs)
+    grad_blocks, grads = _attach_shared(grad_specs)
+    data_blocks, data = _attach_shared(data_specs)
+
+    model = SimpleCNN()
+    model.set_params(params)
+
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        indices, batch_size = msg
+        if len(indices) == 0:
+            for grad in grads.values():
+                grad[...] = 0
+            conn.send(0.0)
+            continue
+
+        # The main process updated the weights in place since the last step
+        model.weights_updated()
+
+        x_batch = data["X"][indices]
+        y_batch = data["y"][indices]
+        output = model.forward(x_batch)
+        loss_sum = -np.sum(y_batch * np.log(output + 1e-8))
+
+        model.backward((output - y_batch) / batch_size, None)
+        for name, grad in model.get_grads().items():
+            grads[name][...] = grad
+        conn.send(loss_sum)
+
+    for block in list(param_blocks.values()) + list(grad_blocks.values()) + list(data_blocks.values()):
+        block.close()
+
+class DataParallelTrainer:
+    """
+    Synchronous data-parallel SGD over worker processes.
+
+    The parameters, the training set and one gradient slot per worker live in
+    multiprocessing.shared_memory, so each step only sends sample indices through
+    a pipe. Workers compute gradients on their shard of the mini-batch; the main
+    process sums the slots and applies the update in place.
+
+    Attributes:
+        model (SimpleCNN): Model whose parameters are backed by shared memory while training.
+        workers (int): Number of worker processes.
+    """
+    def __init__(self, model, X, y_onehot, workers):
+        """
+        Moves the parameters and data into shared memory and starts the workers.
+
+        Args:
+            model (SimpleCNN): Model to train; its parameters are replaced by shared views.
+            X (np.ndarray): Training images.
+            y_onehot (np.ndarray): One-hot encoded labels.
+            workers (int): Number of worker processes.
+        """
+        self.model = model
+        self.workers = workers
+
+        self.param_blocks, self.params, param_specs = _create_shared(model.get_params())
+        model.set_params(self.params)
+        model.weights_updated()
+        self.data_blocks, _, data_specs = _create_shared({"X": X, "y": y_onehot})
+
+        ctx = multiprocessing.get_context("spawn")
+        self.grad_blocks, self.grads, self.conns, self.procs = [], [], [], []
+        for _ in range(workers):
+            blocks, views, grad_specs = _create_shared({name: np.zeros_like(p) for name, p in self.params.items()})
+            self.grad_blocks.append(blocks)
+            self.grads.append(views)
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, args=(child, param_specs, grad_specs, data_specs,
+                                                            conv2d.LOG_SW_GEMMS), daemon=True)
+            proc.start()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+    def step(self, indices, batch_size, lr):
+        """
+        Performs one synchronous SGD step on a mini-batch.
+
+        Args:
+            indices (np.ndarray): Sample indices of the mini-batch.
+            batch_size (int): Loss normalization, as in single-process training.
+            lr (float): Learning rate.
+
+        Returns:
+            float: Mini-batch cross-entropy loss.
+        """
+        shards = np.array_split(indices, self.workers)
+        for conn, shard in zip(self.conns, shards):
+            conn.send((shard, batch_size))
+        loss_sum = sum(conn.recv() for conn in self.conns)
+
+        for name, param in self.params.items():
+            grad = self.grads[0][name].copy()
+            for slot in self.grads[1:]:
+                grad += slot[name]
+            param -= lr * grad
+        self.model.weights_updated()
+        return loss_sum / len(indices)
+
+    def run_epoch(self, permutation, batch_size, lr):
+        """
+        Runs one epoch in the sample order given.
+
+        Args:
+            permutation (np.ndarray): Sample order for this epoch.
+            batch_size (int): Mini-batch size.
+            lr (float): Learning rate.
+
+        Returns:
+            float: Sum of the mini-batch losses.
+        """
+        total_loss = 0
+        for i in range(0, len(permutation), batch_size):
+            total_loss += self.step(permutation[i:i+batch_size], batch_size, lr)
+        return total_loss
+
+    def close(self):
+        """
+        Stops the workers and copies the parameters back into private arrays.
+        """
+        for conn in self.conns:
+            conn.send(None)
+        for proc in self.procs:
+            proc.join()
+        self.model.set_params({name: p.copy() for name, p in self.params.items()})
+        self.model.weights_updated()
+        for blocks in [self.param_blocks, self.data_blocks] + self.grad_blocks:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+
+def scaling_report(X, y_onehot, max_workers, batch_size, lr, seed=0):
+    """
+    Times one epoch for 1 to N workers and checks them against single-process training.
+
+    Args:
+        X (np.ndarray): Training images.
+        y_onehot (np.ndarray): One-hot encoded labels.
+        max_workers (int): Largest number of workers.
+        batch_size (int): Mini-batch size.
+        lr (float): Learning rate.
+        seed (int, optional): Seed for initialization and shuffling. Default is 0.
+    """
+    from CNN_digit_recognizer import train_epoch
+
+    np.random.seed(seed)
+    reference = SimpleCNN()
+    permutation = np.random.permutation(len(X))
+    start = time.perf_counter()
+    train_epoch(reference, X, y_onehot, permutation, batch_size, lr)
+    baseline = time.perf_counter() - start
+    print(f"{'workers':>7} {'epoch (s)':>10} {'speedup':>8} {'efficiency':>10} {'max |dw|':>10}")
+    print(f"{'serial':>7} {baseline:10.2f} {1.0:7.2f}x {'':>10} {0.0:10.2e}")
+
+    for workers in range(1, max_workers + 1):
+        np.random.seed(seed)
+        model = SimpleCNN()
+        permutation = np.random.permutation(len(X))
+        trainer = DataParallelTrainer(model, X, y_onehot, workers)
+        start = time.perf_counter()
+        trainer.run_epoch(permutation, batch_size, lr)
+        elapsed = time.perf_counter() - start
+        trainer.close()
+
+        diff = max(np.max(np.abs(model.get_params()[name] - p)) for name, p in reference.get_params().items())
+        speedup = baseline / elapsed
+        print(f"{workers:7d} {elapsed:10.2f} {speedup:7.2f}x {speedup / workers:10.1%} {diff:10.2e}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python parallel_train.py data_dir [max_workers] [batch_size]")
+        sys.exit(1)
+
+    from CNN_digit_recognizer import load_data, one_hot, LR
+
+    conv2d.MODE = "train"
+    # Per-GEMM logging would make the timings measure stdout contention
+    conv2d.LOG_SW_GEMMS = False
+    X, y = load_data(sys.argv[1])
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else multiprocessing.cpu_count()
+    batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    scaling_report(X, one_hot(y), max_workers, batch_size, LR)
@@ -0,0 +1,126 @@
+import sys
+import numpy as np
+from concurrent.futures import wait, FIRST_COMPLETED
+from matrix_hw_wrapper import matrix_mul_hw_async
+from dense import LowRankDense
+
+def dense_steps(dense, x):
+    """
+    Runs a Dense or LowRankDense layer as a generator that hands its GEMMs to the caller.
+
+    Args:
+        dense (Dense): Layer to run.
+        x (np.ndarray): Input tensor of shape (batch_size, input_size).
+
+    Yields:
+        tuple: (A, B) operands of the next matrix multiplication.
+
+    Returns:
+        np.ndarray: Output tensor of shape (batch_size, output_size), bias added on the host.
+    """
+    if isinstance(dense, LowRankDense):
+        x = yield x, dense.u
+        C = yield x, dense.v
+    else:
+        C = yield x, dense.weights
+    return C + dense.biases
+
+def forward_steps(model, x):
+    """
+    Runs a SimpleCNN forward pass as a generator that hands GEMMs to the caller.
+
+    Every convolution and dense GEMM yields its (A, B) operands and expects the
+    product C to be sent back, so all of them go through the caller's executor.
+    All host-side work (im2col, bias, ReLU, softmax) happens between the yields,
+    so the caller can run it while other GEMMs are in flight.
+
+    Args:
+        model (SimpleCNN): Model whose layers are used for the host-side stages.
+        x (np.ndarray): Input tensor of shape (batch_size, 1, IMG_SIZE, IMG_SIZE).
+
+    Yields:
+        tuple: (A, B) operands of the next matrix multiplication.
+
+    Returns:
+        np.ndarray: Output probabilities after softmax.
+    """
+    # Layers take the model's layout, as in SimpleCNN.features()
+    if model.layout == "NHWC":
+        x = x.transpose(0, 2, 3, 1)
+    for conv, relu in ((model.conv1, model.relu1),
+                       (model.conv2, model.relu2),
+                       (model.conv3, model.relu3)):
+        A, out_h, out_w = conv.im2col(x)
+        C = yield A, conv.filter_matrix()
+        C = conv.matrix_add_bias(C, conv.biases)
+        x = relu.forward(conv.reshape_output(C, x.shape[0], out_h, out_w))
+
+    x = model.flatten.forward(x)
+    x = yield from dense_steps(model.dense1, x)
+    x = model.relu_fc.forward(x)
+    x = yield from dense_steps(model.dense2, x)
+    return model.softmax.forward(x)
+
+def pipelined_forward(model, X, depth=2, micro_batch=1, matmul_async=matrix_mul_hw_async):
+    """
+    Batch inference that overlaps host-side work with in-flight accelerator jobs.
+
+    Up to `depth` micro-batches are kept in flight. While one of them waits for its
+    GEMM, the others run their preprocessing, bias and activations on the CPU.
+
+    Args:
+        model (SimpleCNN): Trained model.
+        X (np.ndarray): Input tensor of shape (num_samples, 1, IMG_SIZE, IMG_SIZE).
+        depth (int, optional): Number of micro-batches in flight. Default is 2.
+        micro_batch (int, optional): Images per accelerator job. Default is 1.
+        matmul_async (callable, optional): Function taking (A, B) and returning a
+            concurrent.futures.Future for A @ B. Default is `matrix_mul_hw_async`.
+
+    Returns:
+        np.ndarray: Output probabilities of shape (num_samples, num_classes).
+    """
+    starts = list(range(0, len(X), micro_batch))
+    results = [None] * len(starts)
+    pending = {}  # future -> (micro-batch index, generator)
+
+    def advance(idx, steps, C):
+        try:
+            A, B = steps.send(C)
+        except StopIteration as stop:
+            results[idx] = stop.value
+            return
+        pending[matmul_async(A, B)] = (idx, steps)
+
+    next_idx = 0
+    while next_idx < len(starts) or pending:
+        # Refill the pipeline; this im2col overlaps with the jobs already queued
+        while next_idx < len(starts) and len(pending) < depth:
+            start = starts[next_idx]
+            advance(next_idx, forward_steps(model, X[start:start+micro_batch]), None)
+            next_idx += 1
+
+        if not pending:
+            continue
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            idx, steps = pending.pop(future)
+            advance(idx, steps, future.result())
+
+    return np.concatenate(results, axis=0)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python pipelined_infer.py image1.jpg [image2.jpg ...]")
+        sys.exit(1)
+
+    from CNN_digit_recognizer import MODEL_FILE, load_image
+    from simple_cnn import SimpleCNN
+
+    print(f"Loading model from '{MODEL_FILE}'...")
+    model = SimpleCNN()
+    model.load(MODEL_FILE)
+
+    X = np.concatenate([load_image(path, model.img_size) for path in sys.argv[1:]], axis=0)
+    output = pipelined_forward(model, X)
+    for path, pred in zip(sys.argv[1:], np.argmax(output, axis=1)):
+        print(f"{path}: predicted class {pred}")
@@ -0,0 +1,164 @@
+import sys
+import numpy as np
+import conv2d
+from simple_cnn import SimpleCNN
+from quantize import layer_inputs, evaluate
+
+CONV_LAYERS = ("conv1", "conv2", "conv3")
+# Layer whose input holds each conv layer's post-ReLU output
+CONSUMERS = {"conv1": "conv2", "conv2": "conv3", "conv3": "dense1"}
+
+def channel_stats(model, X, batch_size=32):
+    """
+    Collects per-filter activation statistics of every conv layer after ReLU.
+
+    Args:
+        model (SimpleCNN): Trained model.
+        X (np.ndarray): Images of shape (num_samples, 1, img_size, img_size).
+        batch_size (int, optional): Batch size. Default is 32.
+
+    Returns:
+        dict: Layer name -> {"mean": mean activation per channel,
+        "active": fraction of samples on which the channel fires anywhere}.
+    """
+    sums = {name: 0.0 for name in CONV_LAYERS}
+    active = {name: 0.0 for name in CONV_LAYERS}
+    for i in range(0, len(X), batch_size):
+        inputs = layer_inputs(model, X[i:i+batch_size])
+        for name in CONV_LAYERS:
+            channels = getattr(model, name).out_channels
+            # dense1 sees the flattened conv3 output; restore (batch, C, H*W)
+            act = inputs[CONSUMERS[name]]
+            if model.layout == "NHWC":
+                act = act.reshape(len(act), -1, channels).transpose(0, 2, 1)
+            else:
+                act = act.reshape(len(act), channels, -1)
+            sums[name] = sums[name] + act.mean(axis=2).sum(axis=0)
+            active[name] = active[name] + (act.max(axis=2) > 0).sum(axis=0)
+    return {name: {"mean": sums[name] / len(X), "active": active[name] / len(X)} for name in CONV_LAYERS}
+
+def select_channels(stats, ratio):
+    """
+    Picks the output channels to keep in every conv layer.
+
+    Channels that never fire are always dropped; of the rest, the fraction
+    `ratio` with the lowest mean activation is removed. At least one channel
+    is kept per layer.
+
+    Args:
+        stats (dict): Output of channel_stats().
+        ratio (float): Fraction of each layer's channels to remove, in [0, 1).
+
+    Returns:
+        dict: Layer name -> sorted indices of the channels to keep.
+    """
+    keep = {}
+    for name in CONV_LAYERS:
+        mean = stats[name]["mean"]
+        alive = np.flatnonzero(stats[name]["active"] > 0)
+        n_keep = min(len(alive), int(np.ceil(len(mean) * (1.0 - ratio))))
+        if n_keep == 0:
+            keep[name] = np.array([int(np.argmax(mean))])
+            continue
+        ranked = alive[np.argsort(mean[alive])[::-1]]
+        keep[name] = np.sort(ranked[:n_keep])
+    return keep
+
+def prune_params(params, keep, img_size):
+    """
+    Slices a SimpleCNN parameter set down to the kept channels.
+
+    Removing output channel c of a conv removes its filter and bias, input channel
+    c of the next conv and, after conv3, the dense1 rows c*H*W ... (c+1)*H*W - 1
+    that the flattened (C, H, W) feature map feeds.
+
+    Args:
+        params (dict): Parameters from SimpleCNN.get_params().
+        keep (dict): Layer name -> indices of the output channels to keep.
+        img_size (int): Input resolution of the model (conv3 output is img_size x img_size).
+
+    Returns:
+        dict: New parameter arrays (copies), loadable with SimpleCNN.set_params().
+    """
+    pruned = {}
+    prev = None
+    for name in CONV_LAYERS:
+        w = params[f"{name}_w"][keep[name]]
+        if prev is not None:
+            w = w[:, prev]
+        pruned[f"{name}_w"] = np.ascontiguousarray(w)
+        pruned[f"{name}_b"] = params[f"{name}_b"][keep[name]].copy()
+        prev = keep[name]
+
+    hw = img_size * img_size
+    rows = (prev[:, None] * hw + np.arange(hw)).ravel()
+    if "dense1_u" in params:
+        # Factored dense1 (LowRankDense): only the left factor sees the features
+        pruned["dense1_u"] = params["dense1_u"][rows]
+        pruned["dense1_v"] = params["dense1_v"].copy()
+    else:
+        pruned["dense1_w"] = params["dense1_w"][rows]
+    pruned["dense1_b"] = params["dense1_b"].copy()
+    pruned["dense2_w"] = params["dense2_w"].copy()
+    pruned["dense2_b"] = params["dense2_b"].copy()
+    return pruned
+
+def prune_model(model, X, ratio, batch_size=32):
+    """
+    Measures activation statistics and returns a pruned copy of the model.
+
+    Args:
+        model (SimpleCNN): Trained model.
+        X (np.ndarray): Images used for the activation statistics.
+        ratio (float): Fraction of each conv layer's channels to remove.
+        batch_size (int, optional): Batch size. Default is 32.
+
+    Returns:
+        tuple: (pruned SimpleCNN in the model's layout, keep dict).
+    """
+    keep = select_channels(channel_stats(model, X, batch_size), ratio)
+    pruned = SimpleCNN()
+    pruned.set_params(prune_params(model.get_params(), keep, model.img_size))
+    pruned.set_layout(model.layout)
+    return pruned, keep
+
+def num_params(model):
+    """
+    Counts the parameters of a model.
+
+    Args:
+        model (SimpleCNN): Model to measure.
+
+    Returns:
+        int: Total number of weights and biases.
+    """
+    return sum(p.size for p in model.get_params().values())
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python prune.py trained_model.pkl data_dir [ratio] [pruned_model.pkl]")
+        sys.exit(1)
+
+    from CNN_digit_recognizer import load_data
+
+    # Software GEMMs for a like-for-like comparison
+    conv2d.MODE = "train"
+
+    model = SimpleCNN()
+    model.load(sys.argv[1])
+    X, y = load_data(sys.argv[2], model.img_size)
+    ratio = float(sys.argv[3]) if len(sys.argv) > 3 else 0.5
+    out_path = sys.argv[4] if len(sys.argv) > 4 else "pruned_model.pkl"
+
+    pruned, keep = prune_model(model, X, ratio)
+    pruned.save(out_path)
+    for name in CONV_LAYERS:
+        print(f"{name}: kept {len(keep[name])}/{getattr(model, name).out_channels} filters")
+    print(f"Pruned model saved to '{out_path}'.")
+
+    base_acc, base_ips = evaluate(model, X, y)
+    pruned_acc, pruned_ips = evaluate(pruned, X, y)
+    print(f"{'model':<8} {'params':>10} {'accuracy':>9} {'images/s':>10}")
+    print(f"{'original':<8} {num_params(model):10d} {base_acc:9.4f} {base_ips:10.1f}")
+    print(f"{'pruned':<8} {num_params(pruned):10d} {pruned_acc:9.4f} {pruned_ips:10.1f}")
+    print(f"Speedup: {pruned_ips / base_ips:.2f}x")
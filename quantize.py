@@ -0,0 +1,283 @@
+import sys
+import time
+import pickle
+import numpy as np
+import conv2d
+from simple_cnn import SimpleCNN
+
+QMAX = 127
+# Share of the images used for calibration by the CLI; the rest is held out for evaluation
+CALIBRATION_FRACTION = 0.2
+# Integer GEMMs run exactly on float BLAS: float32 holds every int up to 2**24,
+# float64 up to 2**53, and |acc| <= K * QMAX * QMAX
+FLOAT32_EXACT_LIMIT = 2 ** 24
+
+CONV_LAYERS = ("conv1", "conv2", "conv3")
+DENSE_LAYERS = ("dense1", "dense2")
+
+def quantize_tensor(x, scale):
+    """
+    Symmetric int8 quantization.
+
+    Args:
+        x (np.ndarray): Float tensor.
+        scale (float or np.ndarray): Quantization step; broadcast against x.
+
+    Returns:
+        np.ndarray: int8 tensor round(x / scale) clipped to [-QMAX, QMAX].
+    """
+    return np.clip(np.round(x / scale), -QMAX, QMAX).astype(np.int8)
+
+def int_gemm(A_q, B_q):
+    """
+    Computes the int8 x int8 -> int32 product A_q @ B_q.
+
+    NumPy's integer matmul does not use BLAS, so the product is computed in float32
+    when the accumulator bound fits its mantissa (float64 otherwise); the result is
+    exact either way.
+
+    Args:
+        A_q (np.ndarray): int8 matrix of shape (M, K).
+        B_q (np.ndarray): int8 matrix of shape (K, N).
+
+    Returns:
+        np.ndarray: int32 matrix of shape (M, N).
+    """
+    dtype = np.float32 if A_q.shape[1] * QMAX * QMAX < FLOAT32_EXACT_LIMIT else np.float64
+    return np.dot(A_q.astype(dtype), B_q.astype(dtype)).astype(np.int32)
+
+def layer_inputs(model, x):
+    """
+    Runs the float model and collects the input of every conv/dense layer.
+
+    Args:
+        model (SimpleCNN): Float model.
+        x (np.ndarray): Input tensor of shape (batch_size, 1, IMG_SIZE, IMG_SIZE).
+
+    Returns:
+        dict: Layer name -> input tensor of that layer, in the model's layout.
+    """
+    inputs = {}
+    if model.layout == "NHWC":
+        x = x.transpose(0, 2, 3, 1)
+    inputs["conv1"] = x
+    x = model.relu1.forward(model.conv1.forward(x))
+    inputs["conv2"] = x
+    x = model.relu2.forward(model.conv2.forward(x))
+    inputs["conv3"] = x
+    x = model.relu3.forward(model.conv3.forward(x))
+    x = model.flatten.forward(x)
+    inputs["dense1"] = x
+    x = model.relu_fc.forward(model.dense1.forward(x))
+    inputs["dense2"] = x
+    return inputs
+
+def calibrate(model, X, batch_size=32):
+    """
+    Computes quantization parameters for every conv and dense layer.
+
+    Weights get one scale per output channel; each layer input gets one scale from
+    its maximum magnitude over the calibration set.
+
+    Args:
+        model (SimpleCNN): Trained float model.
+        X (np.ndarray): Calibration images of shape (num_samples, 1, IMG_SIZE, IMG_SIZE).
+        batch_size (int, optional): Calibration batch size. Default is 32.
+
+    Returns:
+        dict: Quantized model parameters, see QuantizedCNN.
+    """
+    amax = {name: 0.0 for name in CONV_LAYERS + DENSE_LAYERS}
+    for i in range(0, len(X), batch_size):
+        for name, x in layer_inputs(model, X[i:i+batch_size]).items():
+            amax[name] = max(amax[name], float(np.max(np.abs(x))))
+
+    params = {}
+    for name in CONV_LAYERS + DENSE_LAYERS:
+        layer = getattr(model, name)
+        # GEMM layout (K, N) for both layer types
+        W = layer.filter_matrix() if name in CONV_LAYERS else layer.weights
+        w_scale = np.max(np.abs(W), axis=0) / QMAX
+        w_scale[w_scale == 0] = 1.0
+        x_scale = (amax[name] or 1.0) / QMAX
+        params[name] = {
+            "w_q": quantize_tensor(W, w_scale),
+            "w_scale": w_scale,
+            "x_scale": x_scale,
+            # Bias in accumulator units so it can be added in int32
+            "b_q": np.round(layer.biases / (x_scale * w_scale)).astype(np.int32),
+        }
+        if name in CONV_LAYERS:
+            params[name].update(in_channels=layer.in_channels, out_channels=layer.out_channels,
+                                kernel_size=layer.kernel_size, stride=layer.stride,
+                                padding=layer.padding, channels_last=layer.channels_last)
+    return params
+
+class QuantizedCNN:
+    """
+    int8 inference engine for SimpleCNN.
+
+    Every conv/dense layer runs im2col (convs only), an int8 x int8 -> int32 GEMM,
+    adds the int32 bias, applies ReLU on the accumulator and requantizes straight
+    to the int8 input of the next layer. Only the logits are converted back to float.
+
+    Attributes:
+        params (dict): Per-layer quantized weights and scales from calibrate().
+    """
+    def __init__(self, params=None):
+        """
+        Initializes the engine from calibrated parameters.
+
+        Args:
+            params (dict, optional): Output of calibrate(); use load() otherwise.
+        """
+        self.params = params
+        self.convs = {}
+        if params is not None:
+            self._build()
+
+    def _build(self):
+        """
+        Creates Conv2D shells that provide the im2col geometry of each conv layer.
+        """
+        for name in CONV_LAYERS:
+            p = self.params[name]
+            self.convs[name] = conv2d.Conv2D(p["in_channels"], p["out_channels"], p["kernel_size"],
+                                             stride=p["stride"], padding=p["padding"], name=name,
+                                             channels_last=p.get("channels_last", False))
+
+    def _layer(self, name, A_q, next_scale):
+        """
+        Runs one quantized GEMM layer.
+
+        Args:
+            name (str): Layer name.
+            A_q (np.ndarray): int8 input matrix of shape (M, K).
+            next_scale (float or None): Input scale of the next layer; None returns float logits.
+
+        Returns:
+            np.ndarray: int8 activations for the next layer, or float logits.
+        """
+        p = self.params[name]
+        acc = int_gemm(A_q, p["w_q"]) + p["b_q"]
+        out_scale = p["x_scale"] * p["w_scale"]
+        if next_scale is None:
+            return acc * out_scale
+        acc = np.maximum(acc, 0)
+        return quantize_tensor(acc * (out_scale / next_scale), 1.0)
+
+    def forward(self, x):
+        """
+        Performs int8 inference.
+
+        Args:
+            x (np.ndarray): Float input tensor of shape (batch_size, 1, IMG_SIZE, IMG_SIZE).
+
+        Returns:
+            np.ndarray: Output probabilities after softmax.
+        """
+        if self.convs["conv1"].channels_last:
+            x = x.transpose(0, 2, 3, 1)
+        x_q = quantize_tensor(x, self.params["conv1"]["x_scale"])
+        next_layer = {"conv1": "conv2", "conv2": "conv3", "conv3": "dense1"}
+        for name in CONV_LAYERS:
+            conv = self.convs[name]
+            A_q, out_h, out_w = conv.im2col(x_q)
+            C_q = self._layer(name, A_q, self.params[next_layer[name]]["x_scale"])
+            x_q = conv.reshape_output(C_q, x.shape[0], out_h, out_w)
+
+        x_q = x_q.reshape(x.shape[0], -1)
+        x_q = self._layer("dense1", x_q, self.params["dense2"]["x_scale"])
+        logits = self._layer("dense2", x_q, None)
+
+        exp_shifted = np.exp(logits - np.max(logits, axis=1, keepdims=True))
+        return exp_shifted / np.sum(exp_shifted, axis=1, keepdims=True)
+
+    def save(self, path):
+        """
+        Saves the quantized parameters to a file.
+
+        Args:
+            path (str): File path to save the quantized model.
+        """
+        with open(path, 'wb') as f:
+            pickle.dump(self.params, f)
+
+    def load(self, path):
+        """
+        Loads quantized parameters from a file.
+
+        Args:
+            path (str): File path of a model written by save().
+        """
+        with open(path, 'rb') as f:
+            self.params = pickle.load(f)
+        self._build()
+
+def split_calibration(X, y, fraction=CALIBRATION_FRACTION, seed=0):
+    """
+    Splits a dataset into a calibration sample and held-out evaluation images.
+
+    Args:
+        X (np.ndarray): Images.
+        y (np.ndarray): Integer labels.
+        fraction (float, optional): Share of the images used for calibration. Default is CALIBRATION_FRACTION.
+        seed (int, optional): Seed of the random split. Default is 0.
+
+    Returns:
+        tuple: (X_calib, X_eval, y_eval); at least one image ends up in each part.
+    """
+    order = np.random.default_rng(seed).permutation(len(X))
+    n_calib = min(max(1, int(round(len(X) * fraction))), len(X) - 1)
+    return X[order[:n_calib]], X[order[n_calib:]], y[order[n_calib:]]
+
+def evaluate(model, X, y, batch_size=32):
+    """
+    Measures accuracy and throughput of a model.
+
+    Args:
+        model: Object with a forward(x) method returning class probabilities.
+        X (np.ndarray): Images of shape (num_samples, 1, IMG_SIZE, IMG_SIZE).
+        y (np.ndarray): Integer labels.
+        batch_size (int, optional): Inference batch size. Default is 32.
+
+    Returns:
+        tuple: (accuracy, images_per_second).
+    """
+    preds = []
+    t0 = time.perf_counter()
+    for i in range(0, len(X), batch_size):
+        preds.append(np.argmax(model.forward(X[i:i+batch_size]), axis=1))
+    elapsed = time.perf_counter() - t0
+    return np.mean(np.concatenate(preds) == y), len(X) / elapsed
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python quantize.py trained_model.pkl data_dir [quantized_model.pkl]")
+        sys.exit(1)
+
+    from CNN_digit_recognizer import load_data
+
+    # Both models run im2col + one software GEMM per layer, without per-GEMM logging,
+    # for a like-for-like comparison
+    conv2d.MODE = "train"
+    conv2d.CONV_ALGORITHM = "im2col"
+    conv2d.LOG_SW_GEMMS = False
+
+    model = SimpleCNN()
+    model.load(sys.argv[1])
+    X, y = load_data(sys.argv[2], model.img_size)
+    X_calib, X, y = split_calibration(X, y)
+
+    print(f"Calibrating on {len(X_calib)} images, evaluating on {len(X)} held-out images...")
+    qmodel = QuantizedCNN(calibrate(model, X_calib))
+    out_path = sys.argv[3] if len(sys.argv) > 3 else "quantized_model.pkl"
+    qmodel.save(out_path)
+    print(f"Quantized model saved to '{out_path}'.")
+
+    float_acc, float_ips = evaluate(model, X, y)
+    int8_acc, int8_ips = evaluate(qmodel, X, y)
+    print(f"{'model':<8} {'accuracy':>9} {'images/s':>10}")
+    print(f"{'float64':<8} {float_acc:9.4f} {float_ips:10.1f}")
+    print(f"{'int8':<8} {int8_acc:9.4f} {int8_ips:10.1f}")
+    print(f"Speedup: {int8_ips / float_ips:.2f}x")
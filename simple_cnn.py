@@ -1,11 +1,13 @@
 import pickle
+import numpy as np
 from conv2d import Conv2D
-from dense import Dense
+from dense import Dense, LowRankDense
 from flatten import Flatten
 from relu_softmax import ReLU, Softmax
 
 NUM_CLASSES = 10
 IMG_SIZE = 10
+LAYOUTS = ("NCHW", "NHWC")
 
 class SimpleCNN:
     """
@@ -16,45 +18,74 @@ class SimpleCNN:
         - Flatten layer
         - 2 fully connected (Dense) layers with ReLU and Softmax activations
 
+    In the NHWC (channels-last) layout the conv GEMM outputs feed ReLU, the next
+    im2col and Flatten directly, without transposing back to NCHW. dense1 then
+    holds its rows permuted to (H, W, C) flatten order; get_params() and save()
+    still return the canonical (C, H, W) order. NHWC is inference-only.
+
     Methods:
         forward(x): Forward pass through the network.
         backward(d_out, lr): Backward pass for training.
         save(path): Save model parameters to a file.
         load(path): Load model parameters from a file.
     """
-    def __init__(self):
+    def __init__(self, img_size=IMG_SIZE, layout="NCHW"):
         """
         Initializes all layers of the SimpleCNN model.
+
+        Args:
+            img_size (int, optional): Input height and width. Default is IMG_SIZE.
+            layout (str, optional): Activation layout, "NCHW" (default) or "NHWC".
         """
+        self.img_size = img_size
+        self.layout = "NCHW"
+
         # Conv Block 1
-        self.conv1 = Conv2D(in_channels=1, out_channels=8, kernel_size=3, stride=1, padding=1)
+        self.conv1 = Conv2D(in_channels=1, out_channels=8, kernel_size=3, stride=1, padding=1, name="conv1")
         self.relu1 = ReLU()
 
         # Conv Block 2
-        self.conv2 = Conv2D(in_channels=8, out_channels=32, kernel_size=3, stride=1, padding=1)
+        self.conv2 = Conv2D(in_channels=8, out_channels=32, kernel_size=3, stride=1, padding=1, name="conv2")
         self.relu2 = ReLU()
 
         # Conv Block 3
-        self.conv3 = Conv2D(in_channels=32, out_channels=64, kernel_size=3, stride=1, padding=1)
+        self.conv3 = Conv2D(in_channels=32, out_channels=64, kernel_size=3, stride=1, padding=1, name="conv3")
         self.relu3 = ReLU()
 
         # Flatten and Dense
         self.flatten = Flatten()
-        self.dense1 = Dense(input_size=64 * IMG_SIZE * IMG_SIZE, output_size=128)
+        self.dense1 = Dense(input_size=64 * img_size * img_size, output_size=128, name="dense1")
         self.relu_fc = ReLU()
-        self.dense2 = Dense(input_size=128, output_size=NUM_CLASSES)
+        self.dense2 = Dense(input_size=128, output_size=NUM_CLASSES, name="dense2")
         self.softmax = Softmax()
 
+        self.set_layout(layout)
+
     def forward(self, x):
         """
         Performs a forward pass through the network.
 
         Args:
-            x (np.ndarray): Input tensor of shape (batch_size, 1, IMG_SIZE, IMG_SIZE).
+            x (np.ndarray): Input tensor of shape (batch_size, 1, img_size, img_size).
 
         Returns:
             np.ndarray: Output probabilities after softmax.
         """
+        return self.head(self.features(x))
+
+    def features(self, x):
+        """
+        Runs the convolutional part of the network.
+
+        Args:
+            x (np.ndarray): Input tensor of shape (batch_size, 1, img_size, img_size).
+
+        Returns:
+            np.ndarray: Flattened conv3 activations of shape (batch_size, C * H * W),
+            in (H, W, C) order for the NHWC layout.
+        """
+        if self.layout == "NHWC":
+            x = x.transpose(0, 2, 3, 1)
         x = self.conv1.forward(x)
         x = self.relu1.forward(x)
 
@@ -64,7 +95,18 @@ class SimpleCNN:
         x = self.conv3.forward(x)
         x = self.relu3.forward(x)
 
-        x = self.flatten.forward(x)
+        return self.flatten.forward(x)
+
+    def head(self, x):
+        """
+        Runs the fully connected part of the network.
+
+        Args:
+            x (np.ndarray): Flattened features from features().
+
+        Returns:
+            np.ndarray: Output probabilities after softmax.
+        """
         x = self.dense1.forward(x)
         x = self.relu_fc.forward(x)
         x = self.dense2.forward(x)
@@ -77,11 +119,11 @@ class SimpleCNN:
 
         Args:
             d_out (np.ndarray): Gradient of the loss with respect to the output.
-            lr (float): Learning rate for parameter updates.
+            lr (float or None): Learning rate for parameter updates; None only computes gradients.
         """
-        d_out = self.dense2.backward(d_out, lr)
-        d_out = self.relu_fc.backward(d_out)
-        d_out = self.dense1.backward(d_out, lr)
+        if self.layout != "NCHW":
+            raise RuntimeError("Training requires the NCHW layout")
+        d_out = self.backward_head(d_out, lr)
         d_out = self.flatten.backward(d_out)
 
         d_out = self.relu3.backward(d_out)
@@ -93,39 +135,175 @@ class SimpleCNN:
         d_out = self.relu1.backward(d_out)
         d_out = self.conv1.backward(d_out, lr)
 
-    def save(self, path):
+    def backward_head(self, d_out, lr):
         """
-        Saves the model parameters to a file.
+        Backward pass through the fully connected layers only.
 
         Args:
-            path (str): File path to save the model parameters.
+            d_out (np.ndarray): Gradient of the loss with respect to the output.
+            lr (float or None): Learning rate for parameter updates; None only computes gradients.
+
+        Returns:
+            np.ndarray: Gradient with respect to the flattened features.
+        """
+        d_out = self.dense2.backward(d_out, lr)
+        d_out = self.relu_fc.backward(d_out)
+        return self.dense1.backward(d_out, lr)
+
+    def get_params(self):
+        """
+        Returns the model parameters by name (the arrays themselves, not copies).
+
+        In the NHWC layout the dense1 entry is a canonical-order copy.
+
+        Returns:
+            dict: Parameter name -> np.ndarray, as stored by save().
         """
         params = {
             'conv1_w': self.conv1.weights, 'conv1_b': self.conv1.biases,
             'conv2_w': self.conv2.weights, 'conv2_b': self.conv2.biases,
             'conv3_w': self.conv3.weights, 'conv3_b': self.conv3.biases,
-            'dense1_w': self.dense1.weights, 'dense1_b': self.dense1.biases,
+            'dense1_b': self.dense1.biases,
             'dense2_w': self.dense2.weights, 'dense2_b': self.dense2.biases
         }
-        with open(path, 'wb') as f:
-            pickle.dump(params, f)
+        # A factored dense1 is stored as its two factors
+        if isinstance(self.dense1, LowRankDense):
+            params.update(dense1_u=self.dense1.u, dense1_v=self.dense1.v)
+        else:
+            params['dense1_w'] = self.dense1.weights
+        if self.layout == "NHWC":
+            # Back to the canonical row order (copies)
+            key = 'dense1_u' if 'dense1_u' in params else 'dense1_w'
+            params[key] = params[key][self._dense1_rows(to_nhwc=False)]
+        return params
 
-    def load(self, path):
+    def set_params(self, params):
         """
-        Loads model parameters from a file.
+        Installs model parameters; the given arrays are used directly, not copied.
+
+        The input resolution, the channel counts and whether dense1 is factored
+        (LowRankDense) follow from the parameters, so a model trained at any image
+        size, pruned or compressed can be loaded into a default-constructed SimpleCNN.
 
         Args:
-            path (str): File path from which to load the model parameters.
+            params (dict): Parameter name -> np.ndarray, as returned by get_params().
         """
-        with open(path, 'rb') as f:
-            params = pickle.load(f)
+        # dense1 sees conv3_out_channels * img_size**2 features
+        dense1_in = params['dense1_u'] if 'dense1_u' in params else params['dense1_w']
+        self.img_size = int(round((dense1_in.shape[0] / params['conv3_w'].shape[0]) ** 0.5))
         self.conv1.weights = params['conv1_w']
         self.conv1.biases = params['conv1_b']
         self.conv2.weights = params['conv2_w']
         self.conv2.biases = params['conv2_b']
         self.conv3.weights = params['conv3_w']
         self.conv3.biases = params['conv3_b']
-        self.dense1.weights = params['dense1_w']
-        self.dense1.biases = params['dense1_b']
+        if 'dense1_u' in params:
+            self.dense1 = LowRankDense(params['dense1_u'], params['dense1_v'], params['dense1_b'], name="dense1")
+        else:
+            if isinstance(self.dense1, LowRankDense):
+                self.dense1 = Dense(*params['dense1_w'].shape, name="dense1")
+            self.dense1.weights = params['dense1_w']
+            self.dense1.biases = params['dense1_b']
         self.dense2.weights = params['dense2_w']
         self.dense2.biases = params['dense2_b']
+        for conv in (self.conv1, self.conv2, self.conv3):
+            conv.out_channels, conv.in_channels = conv.weights.shape[:2]
+        if self.layout == "NHWC":
+            self._permute_dense1(to_nhwc=True)
+
+    def _dense1_rows(self, to_nhwc):
+        """
+        Row permutation of dense1 between the (C, H, W) and (H, W, C) flatten orders.
+
+        Args:
+            to_nhwc (bool): True to go from canonical to channels-last order.
+
+        Returns:
+            np.ndarray: Index array; new_rows = old_rows[index].
+        """
+        channels = self.conv3.out_channels
+        hw = self.img_size * self.img_size
+        if to_nhwc:
+            return np.arange(channels * hw).reshape(channels, hw).T.ravel()
+        return np.arange(channels * hw).reshape(hw, channels).T.ravel()
+
+    def _permute_dense1(self, to_nhwc):
+        """
+        Reorders the rows of dense1 (or of its left factor) between flatten orders.
+
+        Args:
+            to_nhwc (bool): True to go from canonical to channels-last order.
+        """
+        rows = self._dense1_rows(to_nhwc)
+        if isinstance(self.dense1, LowRankDense):
+            self.dense1.u = self.dense1.u[rows]
+        else:
+            self.dense1.weights = self.dense1.weights[rows]
+
+    def set_layout(self, layout):
+        """
+        Switches the activation layout, permuting the dense1 rows once.
+
+        Args:
+            layout (str): "NCHW" or "NHWC".
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}', expected one of {LAYOUTS}")
+        if layout == self.layout:
+            return
+        self._permute_dense1(to_nhwc=layout == "NHWC")
+        self.layout = layout
+        for conv in (self.conv1, self.conv2, self.conv3):
+            conv.channels_last = layout == "NHWC"
+            # Cached filter layouts (accelerator, Winograd) follow the new order
+            conv.weights_updated()
+
+    def get_grads(self):
+        """
+        Returns the gradients of the last backward pass, keyed like get_params().
+
+        Returns:
+            dict: Parameter name -> gradient array.
+        """
+        grads = {
+            'conv1_w': self.conv1.grad_w, 'conv1_b': self.conv1.grad_b,
+            'conv2_w': self.conv2.grad_w, 'conv2_b': self.conv2.grad_b,
+            'conv3_w': self.conv3.grad_w, 'conv3_b': self.conv3.grad_b,
+            'dense1_b': self.dense1.grad_b,
+            'dense2_w': self.dense2.grad_w, 'dense2_b': self.dense2.grad_b
+        }
+        if isinstance(self.dense1, LowRankDense):
+            grads.update(dense1_u=self.dense1.grad_u, dense1_v=self.dense1.grad_v)
+        else:
+            grads['dense1_w'] = self.dense1.grad_w
+        return grads
+
+    def weights_updated(self):
+        """
+        Notifies the conv layers that their weights were modified in place from outside.
+        """
+        self.conv1.weights_updated()
+        self.conv2.weights_updated()
+        self.conv3.weights_updated()
+
+    def save(self, path):
+        """
+        Saves the model parameters to a file.
+
+        Args:
+            path (str): File path to save the model parameters.
+        """
+        params = self.get_params()
+        with open(path, 'wb') as f:
+            pickle.dump(params, f)
+
+    def load(self, path):
+        """
+        Loads model parameters from a file.
+
+        Args:
+            path (str): File path from which to load the model parameters.
+        """
+        with open(path, 'rb') as f:
+            params = pickle.load(f)
+        self.set_params(params)
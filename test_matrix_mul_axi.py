@@ -0,0 +1,102 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer
+from cocotb.utils import get_sim_time
+import struct
+from axi_lite_driver import AxiLiteMaster
+
+# matrixmul_axi_slave register map
+REG_CONTROL = 0x00
+REG_STATUS = 0x04
+REG_M = 0x08
+REG_K = 0x0C
+REG_N = 0x10
+REG_MEM_ADDR = 0x14
+REG_MEM_WDATA = 0x18
+REG_MEM_RDATA = 0x1C
+
+# Control register: bit0 start, bits[3:2] BRAM select
+CTRL_START = 0x1
+MEM_SEL_A = 0 << 2
+MEM_SEL_B = 1 << 2
+MEM_SEL_C = 2 << 2
+
+# Status register
+STATUS_DONE = 0x2
+
+# Cycles from the MEM_ADDR write to the BRAM word showing up in MEM_RDATA
+# (address register, BRAM address, BRAM output, read data register)
+MEM_READ_LATENCY = 4
+
+@cocotb.test()
+async def matrixmul_axi_test(dut):
+    """
+    Cocotb test for the AXI4-Lite/BRAM matrix multiplication wrapper.
+
+    Loads matrices A and B from 'input_buffer.txt', writes them word by word into
+    the A and B BRAMs through the register map, starts the engine, polls the status
+    register until done, reads C back from its BRAM and writes it to
+    'output_buffer.txt' followed by the simulated transfer and compute times.
+    """
+
+    def float_to_hex(f):
+        return struct.unpack('<I', struct.pack('<f', f))[0]
+
+    def hex_to_float(h):
+        return struct.unpack('<f', struct.pack('<I', h))[0]
+
+    async def write_bram(sel, values):
+        await axi.write(REG_CONTROL, sel)
+        for addr, value in enumerate(values):
+            await axi.write(REG_MEM_ADDR, addr)
+            await axi.write(REG_MEM_WDATA, float_to_hex(value))
+
+    cocotb.start_soon(Clock(dut.s00_axi_aclk, 10, units="ns").start())
+    axi = AxiLiteMaster(dut, "s00_axi")
+
+    with open("input_buffer.txt", "r") as f:
+        lines = f.readlines()
+
+    M = int(lines[0].split()[1])
+    K = int(lines[1].split()[1])
+    N = int(lines[2].split()[1])
+    A_flat = list(map(float, lines[3].split()[1:]))
+    B_flat = list(map(float, lines[4].split()[1:]))
+
+    # Reset DUT
+    dut.s00_axi_aresetn.value = 0
+    await Timer(100, units="ns")
+    dut.s00_axi_aresetn.value = 1
+    await RisingEdge(dut.s00_axi_aclk)
+
+    t_start = get_sim_time(units="ns")
+
+    # --- Dimensions and operands ---
+    await axi.write(REG_M, M)
+    await axi.write(REG_K, K)
+    await axi.write(REG_N, N)
+    await write_bram(MEM_SEL_A, A_flat)
+    await write_bram(MEM_SEL_B, B_flat)
+    dut._log.info(f"Matrices loaded: A {M}x{K}, B {K}x{N}")
+    t_loaded = get_sim_time(units="ns")
+
+    # --- Start the engine and poll for completion ---
+    await axi.write(REG_CONTROL, MEM_SEL_C | CTRL_START)
+    while not (await axi.read(REG_STATUS)) & STATUS_DONE:
+        await axi.wait_cycles(10)
+    dut._log.info("Matrix multiplication complete.")
+    t_done = get_sim_time(units="ns")
+
+    # --- Read matrix C back from its BRAM ---
+    received_C = []
+    for addr in range(M * N):
+        await axi.write(REG_MEM_ADDR, addr)
+        await axi.wait_cycles(MEM_READ_LATENCY)
+        received_C.append(hex_to_float(await axi.read(REG_MEM_RDATA)))
+    t_end = get_sim_time(units="ns")
+
+    with open("output_buffer.txt", "w") as f:
+        f.write("C " + " ".join(map(str, received_C)) + "\n")
+        f.write(f"T {t_loaded - t_start} {t_done - t_loaded} {t_end - t_done}\n")
+
+    dut._log.info(f"Received matrix C: {M}x{N} ({axi.writes} writes, {axi.reads} reads)")
@@ -1,6 +1,7 @@
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, Timer
+from cocotb.utils import get_sim_time
 import struct
 import random
 
@@ -11,7 +12,8 @@ async def matrixmul_spi_test(dut):
 
     Loads matrices A and B from 'input_buffer.txt', sends them to the DUT over SPI,
     waits for the multiplication to complete, triggers transmission of matrix C,
-    receives the result over SPI, and writes it to 'output_buffer.txt'.
+    receives the result over SPI, and writes it to 'output_buffer.txt' followed by
+    the simulated transfer and compute times.
     """
 
     # --- Helper functions ---
@@ -56,6 +58,7 @@ async def matrixmul_spi_test(dut):
     dut.M_in.value = M
     dut.K_in.value = K
     dut.N_in.value = N
+    t_start = get_sim_time(units="ns")
 
     # for i, val in enumerate(A_flat):
     #     dut._log.info(f"[INFO] A[{i}] = {val:.5f} = {float_to_hex(val):08x}")
@@ -85,6 +88,7 @@ async def matrixmul_spi_test(dut):
         if dut.B_loaded.value.integer == 1:
             dut._log.info(f"Matrix B loaded: {dut.K_in.value.integer}x{dut.N_in.value.integer}")
             break
+    t_loaded = get_sim_time(units="ns")
 
     # --- Wait for matrix multiplication to complete ---
     dut._log.info("Waiting for mul_done...")
@@ -93,6 +97,7 @@ async def matrixmul_spi_test(dut):
         if dut.mul_done.value.integer == 1:
             dut._log.info("Matrix multiplication complete.")
             break
+    t_done = get_sim_time(units="ns")
 
     # --- Trigger matrix C transmission ---
     dut.send_c.value = 1
@@ -104,9 +109,11 @@ async def matrixmul_spi_test(dut):
     for _ in range(M * N):
         word = await spi_receive_word(dut)
         received_C.append(hex_to_float(word))
+    t_end = get_sim_time(units="ns")
 
     with open("output_buffer.txt", "w") as f:
         f.write("C " + " ".join(map(str, received_C)) + "\n")
+        f.write(f"T {t_loaded - t_start} {t_done - t_loaded} {t_end - t_done}\n")
 
     dut._log.info(f"Received matrix C: {dut.M_in.value.integer}x{dut.N_in.value.integer}")
 